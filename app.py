@@ -1,17 +1,32 @@
 import json
+from concurrent.futures import wait
 from pathlib import Path
 import streamlit as st
 
 from utils.session_id import get_or_create_session_file, save_turn_to_session
-from utils.ui_helpers import render_message
+from utils.ui_helpers import render_history
 from core.context_block_builder import (
     build_session_init_prompt,
     build_turn_prompt,
 )
-from core.fact_extractor import store_fact, load_facts
-from memory.turn_memory import dump_turn, load_memory
+from core.fact_extractor import store_fact
+from memory.turn_memory import dump_turn
 from memory.session_summarizer import summarize_session
-from persona.mood_tracker import apply_sentiment_to_mood, get_current_mood, update_mood
+from persona.mood_tracker import apply_sentiment_to_mood, update_mood
+from persona.faiss_memory_writer import update_faiss_memory_state_from_session
+from persona.tiny_model_writer import update_tiny_model_state_from_session
+from utils.cached_loaders import (
+    get_side_effect_pool,
+    start_bge_warmup,
+    start_sentiment_warmup,
+    cached_load_facts,
+    cached_memory_turn_count,
+    cached_get_current_mood,
+    cached_load_hormone_levels,
+    clear_state_caches,
+)
+
+SIDE_EFFECT_TIMEOUT = 300  # seconds; first turn may include model downloads
 
 # ------------------------------------------------------------------ #
 #  Streamlit Page Config
@@ -25,6 +40,11 @@ st.title("🧠 Your Memory-Based AI Agent (FAISS + Persona)")
 session_file = get_or_create_session_file(st.session_state)
 session_id = st.session_state["session_id"]
 
+# Warm the embedding and sentiment models in the background, once per
+# process (no-op on later reruns), so the first render does not wait on them
+start_bge_warmup()
+start_sentiment_warmup()
+
 if "turns" not in st.session_state:
     st.session_state.turns = []
 
@@ -67,8 +87,7 @@ if not st.session_state.turns and Path(session_file).exists():
         st.error(f"❌ Error loading session: {e}")
 
 # Display prior messages
-for m in st.session_state.turns:
-    render_message(m)
+render_history(st.session_state.turns)
 
 # ------------------------------------------------------------------ #
 #  Session-level injection
@@ -87,36 +106,33 @@ if user_msg := st.chat_input("Type your message…"):
     with st.chat_message("user"):
         st.markdown(user_msg)
 
-    try:
-        store_fact(user_msg)
-    except Exception as e:
-        st.warning(f"⚠️ Fact storage error: {e}")
-
-    try:
+    # Independent per-turn side effects run concurrently (they are I/O- or
+    # model-bound and release the GIL); the prompt is built once all finish.
+    def _process_mood():
         print(f"\n=== MOOD PROCESSING START ===")
         print(f"[App.py]: Processing user input: '{user_msg}'")
         apply_sentiment_to_mood(user_msg)
         print(f"[App.py]: Mood processing completed")
         print(f"=== MOOD PROCESSING END ===\n")
-    except Exception as e:
-        st.warning(f"⚠️ Mood processing error: {e}")
-        print(f"[Mood Error]: {e}")
-
-    # 🔄 FAISS memory state update
-    try:
-        from persona.faiss_memory_writer import update_faiss_memory_state_from_session
-        update_faiss_memory_state_from_session(session_id)
-    except Exception as e:
-        st.warning(f"⚠️ FAISS memory write error: {e}")
-        print(f"[FAISS Error]: {e}")
 
-    # 🔄 TINY MODEL update
-    try:
-        from persona.tiny_model_writer import update_tiny_model_state_from_session
-        update_tiny_model_state_from_session(session_id)
-    except Exception as e:
-        st.warning(f"⚠️ Tiny model write error: {e}")
-        print(f"[Tiny Model Error]: {e}")
+    side_effects = {
+        "Fact storage": lambda: store_fact(user_msg),
+        "Mood processing": _process_mood,
+        # 🔄 FAISS memory state + TINY MODEL updates
+        "FAISS memory write": lambda: update_faiss_memory_state_from_session(session_id),
+        "Tiny model write": lambda: update_tiny_model_state_from_session(session_id),
+    }
+    pool = get_side_effect_pool()
+    futures = {pool.submit(fn): label for label, fn in side_effects.items()}
+    done, not_done = wait(futures, timeout=SIDE_EFFECT_TIMEOUT)
+    for fut in futures:
+        label = futures[fut]
+        if fut in not_done:
+            st.warning(f"⚠️ {label} still running after {SIDE_EFFECT_TIMEOUT}s")
+            print(f"[{label} Timeout]")
+        elif fut.exception() is not None:
+            st.warning(f"⚠️ {label} error: {fut.exception()}")
+            print(f"[{label} Error]: {fut.exception()}")
 
     turn_block = build_turn_prompt(user_msg, session_id)
     with st.chat_message("assistant"):
@@ -125,6 +141,7 @@ if user_msg := st.chat_input("Type your message…"):
     clean_placeholder = "Prompt generated"
     save_turn_to_session({"user": user_msg, "assistant": clean_placeholder}, st.session_state)
     dump_turn({"user": user_msg, "assistant": clean_placeholder})
+    clear_state_caches()
 
 # ------------------------------------------------------------------ #
 #  Sidebar
@@ -140,55 +157,71 @@ if st.sidebar.button("End Chat & Save to Long-Term Memory"):
     except Exception as e:
         st.sidebar.error(f"❌ Could not summarize session: {e}")
 
-st.sidebar.header("🎭 Mood Status")
-try:
-    current_mood_data = get_current_mood()
-    st.sidebar.write(f"**Current Mood:** {current_mood_data['current_mood']}")
-    st.sidebar.write(f"**Intensity:** {current_mood_data['intensity']:.2f}")
-    
-    mood_context = current_mood_data.get('context', {})
-    if mood_context.get('is_hybrid'):
-        st.sidebar.write("🔀 **Hybrid State**")
-    if mood_context.get('is_emergent'):
-        st.sidebar.write("⚡ **Emergent State**")
-    
-    st.sidebar.write(f"**Stability:** {mood_context.get('stability', 'medium')}")
-
-    # Use neutral API instead of direct import from hormone_adjuster
-    from persona.hormone_api import load_hormone_levels, save_hormone_levels
-    hormones = load_hormone_levels()
-    with st.sidebar.expander("🧪 Hormone Levels"):
-        for hormone, level in hormones.items():
-            if level > 0.7:
-                st.sidebar.write(f"🔴 {hormone.title()}: {level:.2f}")
-            elif level < 0.3:
-                st.sidebar.write(f"🔵 {hormone.title()}: {level:.2f}")
-            else:
-                st.sidebar.write(f"⚪ {hormone.title()}: {level:.2f}")
-
-    with st.sidebar.expander("🧪 Manual Mood Testing"):
-        if st.button("Test Positive"):
-            apply_sentiment_to_mood("I love this amazing wonderful experience")
-            st.rerun()
-        if st.button("Test Negative"):
-            apply_sentiment_to_mood("I hate this terrible awful situation")
-            st.rerun()
-        if st.button("Reset to Neutral"):
-            update_mood("neutral", 0.5, "manual_reset")
-            # Use save_hormone_levels from neutral API
-            save_hormone_levels({"dopamine": 0.5, "serotonin": 0.5, "cortisol": 0.5, "oxytocin": 0.5})
-            st.rerun()
-except Exception as e:
-    st.sidebar.error(f"❌ Mood status error: {e}")
-
-st.sidebar.header("🔧 Debug")
-st.sidebar.write(f"Session ID : `{session_id[:8]}...`")
-st.sidebar.write(f"Turn count : {len(st.session_state.turns)}")
-st.sidebar.write(f"Global memory turns: {len(load_memory())}")
-
-facts = load_facts()
-if facts:
-    st.sidebar.write(f"Stored facts: {len(facts)}")
-    with st.sidebar.expander("View last 5 facts"):
-        for i, fct in enumerate(facts[-5:], 1):
-            st.sidebar.write(f"{i}. {fct}")
+# Sidebar panels run as fragments: their buttons rerun only the panel,
+# not the chat pipeline above. Fragments write via st.* inside
+# `with st.sidebar:` because st.sidebar can't be called from a fragment.
+@st.fragment
+def mood_panel():
+    st.header("🎭 Mood Status")
+    try:
+        current_mood_data = cached_get_current_mood()
+        st.write(f"**Current Mood:** {current_mood_data['current_mood']}")
+        st.write(f"**Intensity:** {current_mood_data['intensity']:.2f}")
+
+        mood_context = current_mood_data.get('context', {})
+        if mood_context.get('is_hybrid'):
+            st.write("🔀 **Hybrid State**")
+        if mood_context.get('is_emergent'):
+            st.write("⚡ **Emergent State**")
+
+        st.write(f"**Stability:** {mood_context.get('stability', 'medium')}")
+
+        # Use neutral API instead of direct import from hormone_adjuster
+        from persona.hormone_api import save_hormone_levels
+        hormones = cached_load_hormone_levels()
+        with st.expander("🧪 Hormone Levels"):
+            for hormone, level in hormones.items():
+                if level > 0.7:
+                    st.write(f"🔴 {hormone.title()}: {level:.2f}")
+                elif level < 0.3:
+                    st.write(f"🔵 {hormone.title()}: {level:.2f}")
+                else:
+                    st.write(f"⚪ {hormone.title()}: {level:.2f}")
+
+        with st.expander("🧪 Manual Mood Testing"):
+            if st.button("Test Positive"):
+                apply_sentiment_to_mood("I love this amazing wonderful experience")
+                clear_state_caches()
+                st.rerun(scope="fragment")
+            if st.button("Test Negative"):
+                apply_sentiment_to_mood("I hate this terrible awful situation")
+                clear_state_caches()
+                st.rerun(scope="fragment")
+            if st.button("Reset to Neutral"):
+                update_mood("neutral", 0.5, "manual_reset", force=True)
+                # Use save_hormone_levels from neutral API
+                save_hormone_levels({"dopamine": 0.5, "serotonin": 0.5, "cortisol": 0.5, "oxytocin": 0.5})
+                clear_state_caches()
+                st.rerun(scope="fragment")
+    except Exception as e:
+        st.error(f"❌ Mood status error: {e}")
+
+
+@st.fragment
+def debug_panel():
+    st.header("🔧 Debug")
+    st.write(f"Session ID : `{session_id[:8]}...`")
+    st.write(f"Turn count : {len(st.session_state.turns)}")
+    st.write(f"Global memory turns: {cached_memory_turn_count()}")
+
+    facts = cached_load_facts()
+    if facts:
+        st.write(f"Stored facts: {len(facts)}")
+        with st.expander("View last 5 facts"):
+            for i, fct in enumerate(facts[-5:], 1):
+                st.write(f"{i}. {fct}")
+
+
+with st.sidebar:
+    mood_panel()
+    debug_panel()
@@ -1,26 +1,34 @@
-# core/api_client.py (Unchanged)
+# core/api_client.py
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from config.constants import API_KEY, BASE_URL, MODEL
 
-def get_completion(messages, temperature=0.3, top_p=0.8, max_tokens=512):
-    payload = {
+# One pooled session per process: keeps the TCP/TLS connection to OpenRouter alive
+_SESSION = requests.Session()
+_SESSION.headers.update({
+    "Authorization": f"Bearer {API_KEY}",
+    "Content-Type": "application/json",
+    "HTTP-Referer": "https://openrouter.ai",
+    "X-Title": "Streamlit-Mythalion",
+})
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+def _payload(messages, temperature, top_p, max_tokens, stream):
+    return {
         "model": MODEL,
         "messages": messages,
         "temperature": temperature,
         "top_p": top_p,
         "max_tokens": max_tokens,
-        "stream": False,
-    }
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://openrouter.ai",
-        "X-Title": "Streamlit-Mythalion",
+        "stream": stream,
     }
 
-    response = requests.post(
+def get_completion(messages, temperature=0.3, top_p=0.8, max_tokens=512):
+    payload = _payload(messages, temperature, top_p, max_tokens, stream=False)
+
+    response = _SESSION.post(
         f"{BASE_URL}/chat/completions",
-        headers=headers,
         json=payload,
         timeout=300,
     )
@@ -29,3 +37,32 @@ def get_completion(messages, temperature=0.3, top_p=0.8, max_tokens=512):
         raise Exception(f"OpenRouter Error: {response.status_code} - {response.text}")
 
     return response.json()["choices"][0]["message"]["content"]
+
+def stream_completion(messages, temperature=0.3, top_p=0.8, max_tokens=512):
+    """
+    Same request as get_completion, but yields content tokens as they arrive
+    (OpenRouter server-sent events). Render with st.write_stream(...).
+    """
+    payload = _payload(messages, temperature, top_p, max_tokens, stream=True)
+
+    with _SESSION.post(
+        f"{BASE_URL}/chat/completions",
+        json=payload,
+        timeout=300,
+        stream=True,
+    ) as response:
+        if response.status_code != 200:
+            print("OpenRouter Error:", response.text)
+            raise Exception(f"OpenRouter Error: {response.status_code} - {response.text}")
+
+        for line in response.iter_lines():
+            # Skip keep-alive blanks and ": OPENROUTER PROCESSING" comments
+            if not line.startswith(b"data: "):
+                continue
+            data = line[6:]
+            if data == b"[DONE]":
+                break
+            choices = orjson.loads(data).get("choices") or [{}]
+            token = choices[0].get("delta", {}).get("content")
+            if token:
+                yield token
@@ -0,0 +1,273 @@
+"""
+core/index_cache.py
+Process-level cache of the FAISS indexes used by the retrieval path.
+
+Each named corpus ("short", "long_<user>", ...) keeps its normalized
+embeddings as an int8 matrix with one float32 scale per row, in memory
+and on disk as append-only files (data/<name>.codes.i8, .scales.f32 and
+.texts.ndjson, plus a small .meta.json). When new texts are appended to a
+corpus only the delta is embedded, added and appended to the files; the
+matrix is rebuilt and the files rewritten only if earlier texts changed. Small corpora are searched with a single matmul; an 8-bit
+scalar-quantized FAISS index is built over the same vectors once the
+corpus is large, and an HNSW graph once it is very large.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.faiss_utils import faiss
+from core.vectorstore import embed_batch
+
+INDEX_DIR = Path("data")
+INDEX_DIR.mkdir(exist_ok=True)
+
+# Below this many vectors a plain BLAS matmul beats any FAISS index
+FLAT_SEARCH_MAX = 512
+# From this many vectors on, an HNSW graph replaces exhaustive search
+HNSW_MIN = 2000
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 100
+HNSW_EF_SEARCH = 32
+
+
+def _quantize(vecs: np.ndarray):
+    """Row-wise symmetric int8 quantization: vecs ~= codes * scales[:, None]."""
+    scales = np.abs(vecs).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(vecs / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def _top_k(scores: np.ndarray, k: int):
+    """(D, I) for the k best of a 1-D score vector, best first."""
+    n = len(scores)
+    k = min(k, n)
+    top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+    top = top[np.argsort(-scores[top])]
+    return scores[top][None, :], top[None, :]
+
+
+class CachedIndex:
+    """Quantized embeddings + texts; `.search` mirrors faiss' (D, I) return shape."""
+
+    def __init__(self, codes: np.ndarray, scales: np.ndarray, texts: List[str],
+                 mtime: Optional[int] = None):
+        self.codes = codes
+        self.scales = scales
+        self.texts = texts
+        self.mtime = mtime
+        self.persisted = 0  # leading rows already written to disk by _persist()
+        self._index = None
+
+    @classmethod
+    def from_vectors(cls, vecs: np.ndarray, texts: List[str]) -> "CachedIndex":
+        return cls(*_quantize(vecs), texts)
+
+    def _dequantized(self) -> np.ndarray:
+        return self.codes.astype(np.float32) * self.scales[:, None]
+
+    @property
+    def index(self):
+        """
+        FAISS index over the same vectors, built on first use: 8-bit scalar
+        quantized below HNSW_MIN vectors, an inner-product HNSW graph above.
+        Vectors are normalized, so inner product is cosine either way.
+        """
+        if self._index is None:
+            vecs = self._dequantized()
+            d = vecs.shape[1]
+            if len(vecs) >= HNSW_MIN:
+                self._index = faiss.IndexHNSWFlat(d, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+                self._index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+                self._index.hnsw.efSearch = HNSW_EF_SEARCH
+            else:
+                self._index = faiss.IndexScalarQuantizer(
+                    d, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+                )
+                self._index.train(vecs)
+            self._index.add(vecs)
+        return self._index
+
+    def add(self, vecs: np.ndarray, texts: List[str]) -> None:
+        codes, scales = _quantize(vecs)
+        self.codes = np.vstack([self.codes, codes])
+        self.scales = np.concatenate([self.scales, scales])
+        self.texts = self.texts + texts
+        if self._index is None:
+            return
+        if len(self.texts) >= HNSW_MIN and not isinstance(self._index, faiss.IndexHNSWFlat):
+            self._index = None  # rebuilt as HNSW on next use
+        else:
+            # Same dequantized vectors a fresh build would index, so a loaded
+            # and a live-extended index score every text alike
+            self._index.add(codes.astype(np.float32) * scales[:, None])  # HNSW graphs grow incrementally
+
+    def search(self, qvec: np.ndarray, k: int):
+        n = len(self.texts)
+        if n >= FLAT_SEARCH_MAX:
+            return self.index.search(qvec, k)
+        scores = (self.codes.astype(np.float32) @ qvec[0]) * self.scales
+        return _top_k(scores, k)
+
+
+_CACHE: Dict[str, CachedIndex] = {}
+# Serializes get_index()'s diff-and-insert across sessions/threads
+_LOCK = threading.Lock()
+
+# Stacked codes of the last set of small corpora passed to search_many();
+# keyed on the code arrays themselves, which add() replaces rather than mutates.
+_STACKED: Dict[str, object] = {"key": None}
+
+
+def _stacked(entries: List[CachedIndex]):
+    key = tuple(id(e.codes) for e in entries)
+    if _STACKED["key"] != key:
+        _STACKED.update(
+            key=key,
+            refs=[e.codes for e in entries],  # keeps the ids in `key` from being reused
+            codes=np.vstack([e.codes for e in entries]).astype(np.float32),
+            scales=np.concatenate([e.scales for e in entries]),
+            bounds=np.cumsum([0] + [len(e.texts) for e in entries]),
+        )
+    return _STACKED["codes"], _STACKED["scales"], _STACKED["bounds"]
+
+
+def search_many(entries: List[CachedIndex], qvec: np.ndarray, ks: List[int]):
+    """
+    Search several corpora for the same query; returns one (D, I) per entry
+    with indices local to that entry. Small corpora share a single matmul
+    over their stacked codes, and each segment takes its own top-k.
+    """
+    if any(len(e.texts) >= FLAT_SEARCH_MAX for e in entries):
+        return [e.search(qvec, k) for e, k in zip(entries, ks)]
+    codes, scales, bounds = _stacked(entries)
+    scores = (codes @ qvec[0]) * scales
+    return [_top_k(scores[lo:hi], k) for lo, hi, k in zip(bounds[:-1], bounds[1:], ks)]
+
+
+def _paths(name: str):
+    """(meta, codes, scales, texts) files of a persisted corpus."""
+    return tuple(INDEX_DIR / f"{name}.{ext}" for ext in ("meta.json", "codes.i8", "scales.f32", "texts.ndjson"))
+
+
+def _load_persisted(name: str) -> Optional[CachedIndex]:
+    meta_path, codes_path, scales_path, texts_path = _paths(name)
+    if not all(p.exists() for p in (meta_path, codes_path, scales_path, texts_path)):
+        return None
+    try:
+        dim = json.loads(meta_path.read_text(encoding="utf-8"))["dim"]
+        raw = texts_path.read_bytes()
+        end = raw.rfind(b"\n") + 1  # a torn last line is dropped
+        texts = [json.loads(line) for line in raw[:end].splitlines()]
+        n = len(texts)
+        codes = np.fromfile(codes_path, dtype=np.int8)
+        scales = np.fromfile(scales_path, dtype=np.float32)
+        if len(codes) < n * dim or len(scales) < n:
+            return None
+        # Rows past the last complete text are left over from an interrupted
+        # append; cut them off so the next append lines up with the texts
+        if end < len(raw) or len(codes) > n * dim or len(scales) > n:
+            os.truncate(texts_path, end)
+            os.truncate(codes_path, n * dim)
+            os.truncate(scales_path, n * 4)
+    except Exception as e:
+        print(f"[Index Cache]: Discarding unreadable index '{name}': {e}")
+        return None
+    entry = CachedIndex(codes[: n * dim].reshape(n, dim), scales[:n], texts)
+    entry.persisted = n
+    return entry
+
+
+def _persist(name: str, entry: CachedIndex) -> None:
+    """Append the rows added since the last persist, or write every file if none are on disk yet."""
+    meta_path, codes_path, scales_path, texts_path = _paths(name)
+    start = entry.persisted
+    mode = "ab" if start else "wb"
+    try:
+        if not start:
+            texts_path.write_bytes(b"")  # old rows must not outlive a rewrite
+            meta_path.write_text(json.dumps({"dim": int(entry.codes.shape[1])}), encoding="utf-8")
+        # Texts go last: a row only counts once its text line is complete
+        with open(codes_path, mode) as f:
+            f.write(entry.codes[start:].tobytes())
+        with open(scales_path, mode) as f:
+            f.write(entry.scales[start:].tobytes())
+        lines = "".join(json.dumps(t, ensure_ascii=False) + "\n" for t in entry.texts[start:])
+        with open(texts_path, mode) as f:
+            f.write(lines.encode("utf-8"))
+        entry.persisted = len(entry.texts)
+    except Exception as e:
+        print(f"[Index Cache]: Failed to persist index '{name}': {e}")
+        entry.persisted = 0  # rewrite everything on the next persist
+
+
+def _source_mtime(source: Optional[Path]) -> Optional[int]:
+    if source is None:
+        return None
+    try:
+        return source.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _resolve(name: str, texts: List[str], mtime: Optional[int]):
+    """Return (cached_entry_or_None, texts_still_to_embed)."""
+    entry = _CACHE.get(name) or _load_persisted(name)
+    if entry is not None:
+        n = len(entry.texts)
+        if mtime is not None and entry.mtime == mtime and n == len(texts):
+            return entry, []
+        if n <= len(texts) and texts[:n] == entry.texts:
+            return entry, texts[n:]
+    # Cold start or rewritten corpus: everything needs embedding
+    return None, list(texts)
+
+
+def missing_texts(name: str, texts: List[str], source: Optional[Path] = None) -> List[str]:
+    """Texts that get_index() would have to embed for this corpus right now."""
+    return _resolve(name, texts, _source_mtime(source))[1]
+
+
+def get_index(
+    name: str,
+    texts: List[str],
+    source: Optional[Path] = None,
+    precomputed: Optional[Tuple[List[str], np.ndarray]] = None,
+) -> CachedIndex:
+    """
+    Return an up-to-date index over `texts` for the corpus `name`.
+    `source` is the file the texts were read from; an unchanged mtime lets
+    repeated calls skip even the prefix comparison.
+    `precomputed` is an optional (texts, vectors) pair the caller encoded for
+    missing_texts(), so several corpora (and the query) can share one encode.
+    The diff against the cache and the insert happen under one lock, and the
+    vectors are only used if their texts are still exactly the missing ones
+    (another session may have extended the corpus in between); otherwise the
+    delta is embedded here.
+    """
+    if not texts:
+        raise ValueError("No texts supplied to build a FAISS index")
+
+    mtime = _source_mtime(source)
+    with _LOCK:
+        entry, new_texts = _resolve(name, texts, mtime)
+        if new_texts:
+            if precomputed is not None and precomputed[0] == new_texts:
+                vecs = precomputed[1]
+            else:
+                vecs = embed_batch(new_texts)
+            if entry is None:
+                entry = CachedIndex.from_vectors(vecs, new_texts)
+            else:
+                entry.add(vecs, new_texts)
+            _persist(name, entry)
+        entry.mtime = mtime
+        _CACHE[name] = entry
+    return entry
+
+
+__all__ = ["CachedIndex", "get_index", "missing_texts", "search_many"]
@@ -1,34 +1,90 @@
 #vectorstore.py
-import json
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+import orjson
 import numpy as np
 from pathlib import Path
-from langchain_community.vectorstores import FAISS
 from langchain_core.embeddings import Embeddings
 from langchain_core.documents import Document
-from sentence_transformers import SentenceTransformer
 from config.constants import MEMORY_FILE
 
-# Load BGE-M3 model (singleton to avoid reloading)
+# sentence_transformers (torch) and langchain_community's FAISS store are
+# imported where they are first needed, so importing this module for
+# embed_batch/load_docs does not pay the multi-second torch import.
+
+# Load BGE-M3 model (singleton to avoid reloading).
+# utils/cached_loaders.start_bge_warmup() loads it in the background for
+# Streamlit; the lock keeps that and the first real encode from both loading it.
 _bge_model = None
+_bge_lock = threading.Lock()
+
+# Instruction prefixes, registered on the model as named prompts
+BGE_PROMPTS = {"passage": "passage: ", "query": "query: "}
 
 def get_bge_model():
     global _bge_model
     if _bge_model is None:
-        print("🔄 Loading BGE-M3 model...")
-        _bge_model = SentenceTransformer("BAAI/bge-m3")
-        print("✅ BGE-M3 model loaded")
+        with _bge_lock:
+            if _bge_model is None:
+                from sentence_transformers import SentenceTransformer
+                print("🔄 Loading BGE-M3 model...")
+                _bge_model = SentenceTransformer("BAAI/bge-m3", prompts=BGE_PROMPTS)
+                print("✅ BGE-M3 model loaded")
     return _bge_model
 
-def _bge_embed(texts: list[str]) -> list[list[float]]:
+def _bge_embed(texts: list[str], prompt_name: str) -> np.ndarray:
+    model = get_bge_model()
+    return model.encode(
+        texts, prompt_name=prompt_name, normalize_embeddings=True, batch_size=32
+    )
+
+def embed_batch(passages: list[str], queries: list[str] = ()) -> np.ndarray:
+    """
+    Encode passages and queries in ONE model.encode call.
+    Rows come back in order: all passages first, then all queries.
+    (prompt_name applies to a whole call, so the mixed batch prefixes by hand.)
+    """
     model = get_bge_model()
-    return model.encode(texts, normalize_embeddings=True)
+    inputs = [BGE_PROMPTS["passage"] + t for t in passages] + [
+        BGE_PROMPTS["query"] + q for q in queries
+    ]
+    vecs = model.encode(
+        inputs, normalize_embeddings=True, batch_size=32, convert_to_numpy=True
+    )
+    return np.ascontiguousarray(vecs, dtype=np.float32)
+
+# Longest wait for the embed queue; generous because the first request also
+# pays for loading BGE-M3 in the worker thread.
+EMBED_QUEUE_TIMEOUT = 120.0  # seconds
+
+def embed_queued(passages: list[str], queries: list[str] = (),
+                 timeout: float = EMBED_QUEUE_TIMEOUT) -> np.ndarray:
+    """
+    Same rows as embed_batch(), but encoded through utils/embed_queue so that
+    concurrent Streamlit sessions share forward passes.
+    Raises TimeoutError if the queue worker has not answered within `timeout`.
+    """
+    from utils.embed_queue import embed_many
+    futures = embed_many([BGE_PROMPTS["passage"] + t for t in passages] + [
+        BGE_PROMPTS["query"] + q for q in queries
+    ])
+    deadline = time.monotonic() + timeout
+    try:
+        vecs = [f.result(timeout=max(0.0, deadline - time.monotonic())) for f in futures]
+    except FutureTimeout:
+        raise TimeoutError(f"Embed queue returned no vectors within {timeout:g}s") from None
+    return np.ascontiguousarray(np.stack(vecs), dtype=np.float32)
 
 class BGEEmbeddings(Embeddings):
     def embed_documents(self, texts):
-        return _bge_embed([f"passage: {t}" for t in texts])
+        return _bge_embed(texts, "passage")
 
     def embed_query(self, text):
-        return _bge_embed([f"query: {text}"])[0]
+        # Coalesced with encodes from other sessions (see utils/embed_queue.py)
+        return embed_queued([], [text])[0]
 
 def load_docs_from_memory_json():
     docs = []
@@ -37,23 +93,73 @@ def load_docs_from_memory_json():
         return docs
 
     try:
-        with open(MEMORY_FILE, "r", encoding="utf-8") as f:
+        with open(MEMORY_FILE, "rb") as f:
             for line in f:
+                if not line.strip():
+                    continue
                 try:
-                    item = json.loads(line.strip())
+                    item = orjson.loads(line)
                     turn = item.get("turn", {})
                     user = turn.get("user", "")
                     assistant = turn.get("assistant", "")
                     if user or assistant:
                         text = f"User: {user}\nAssistant: {assistant}"
                         docs.append(Document(page_content=text))
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     print(f"⚠️ Skipping bad line in memory.json: {e}")
     except Exception as e:
         print(f"⚠️ Error loading memory file: {e}")
     return docs
 
+# Passage embeddings of the memory docs, one float32 row per doc, plus a
+# sidecar of per-row text hashes so unchanged rows survive a rebuild.
+EMB_FILE = MEMORY_FILE.parent / "emb.f32"
+EMB_META_FILE = MEMORY_FILE.parent / "emb.f32.json"
+
+def _text_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+def _memory_embeddings(texts: list[str]) -> np.memmap:
+    """
+    Normalized passage embeddings for `texts` as a float32 memmap over
+    data/emb.f32. Rows for the longest unchanged prefix are reused from disk;
+    only the rest are encoded and written.
+    """
+    keys = [_text_key(t) for t in texts]
+    kept, dim = 0, None
+    try:
+        meta = orjson.loads(EMB_META_FILE.read_bytes())
+        cached, dim = meta["keys"], meta["dim"]
+        if EMB_FILE.stat().st_size == len(cached) * dim * 4:
+            for old, new in zip(cached, keys):
+                if old != new:
+                    break
+                kept += 1
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"⚠️ Discarding embedding cache: {e}")
+
+    new_vecs = embed_batch(texts[kept:]) if kept < len(texts) else None
+    if not kept:
+        dim = new_vecs.shape[1]
+
+    with open(EMB_FILE, "ab"):
+        pass
+    os.truncate(EMB_FILE, len(texts) * dim * 4)
+    arr = np.memmap(EMB_FILE, dtype=np.float32, mode="r+", shape=(len(texts), dim))
+    if new_vecs is not None:
+        arr[kept:] = new_vecs
+        arr.flush()
+    EMB_META_FILE.write_bytes(orjson.dumps({"dim": dim, "keys": keys}))
+    print(f"🧮 Embeddings: reused {kept}, encoded {len(texts) - kept}")
+    return arr
+
 def build_store():
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.vectorstores.utils import DistanceStrategy
     embeddings = BGEEmbeddings()
     memory_docs = load_docs_from_memory_json()
 
@@ -65,7 +171,16 @@ def build_store():
         return store
 
     print(f"🔍 Building FAISS index from {len(memory_docs)} documents...")
-    store = FAISS.from_documents(memory_docs, embedding=embeddings)
+    arr = _memory_embeddings([d.page_content for d in memory_docs])
+    index = faiss.IndexFlatIP(arr.shape[1])
+    index.add(np.asarray(arr))  # one contiguous add straight from the memmap
+    store = FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=InMemoryDocstore({str(i): d for i, d in enumerate(memory_docs)}),
+        index_to_docstore_id={i: str(i) for i in range(len(memory_docs))},
+        distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT,
+    )
 
     # Optional: log top-4 matches to sanity check
     if memory_docs:
@@ -1,10 +1,10 @@
 #memory/context_retriever.py
 from typing import List
-import numpy as np
 
-from memory.turn_memory import load_memory
-from memory.long_term_memory import load_long_term_memory
-from core.faiss_utils import load_faiss_index, BGEEmbeddings
+from memory.turn_memory import CHAT_FILE, load_memory
+from memory.long_term_memory import LONG_TERM_FILE, load_long_term_memory
+from core.index_cache import get_index, missing_texts, search_many
+from core.vectorstore import embed_queued
 
 
 def retrieve_top_memories(
@@ -15,31 +15,39 @@ def retrieve_top_memories(
     score_threshold: float = 0.35,
 ) -> tuple[list[str], list[str]]:
     """Return (short_matches, long_matches)."""
-    # -------- short-term -------- #
     turns = load_memory()
     short_texts = [
         f"User: {t['user']}\nAssistant: {t['assistant']}" for t in turns if t.get("user")
     ]
-    short_matches: List[str] = []
-    if short_texts:
-        store = load_faiss_index(short_texts)
-        D, I = store.index.search(
-            np.array([BGEEmbeddings().embed_query(user_query)]), k=k_short
-        )
-        for idx, score in zip(I[0], D[0]):
-            if idx >= 0 and score >= score_threshold:
-                short_matches.append(short_texts[idx])
-
-    # -------- long-term -------- #
     summaries = [e.get("summary", "") for e in load_long_term_memory(user_id)]
-    long_matches: List[str] = []
+    if not short_texts and not summaries:
+        return [], []
+
+    long_name = f"long_{user_id or 'all'}"
+    short_new = missing_texts("short", short_texts, CHAT_FILE) if short_texts else []
+    long_new = missing_texts(long_name, summaries, LONG_TERM_FILE) if summaries else []
+
+    # Every not-yet-indexed passage plus the query, batched with other sessions'
+    vecs = embed_queued(short_new + long_new, [user_query])
+    n_short = len(short_new)
+    short_pre = (short_new, vecs[:n_short])
+    long_pre = (long_new, vecs[n_short:n_short + len(long_new)])
+    qvec = vecs[-1:]
+
+    # Both corpora are scored against the query in one pass
+    corpora = []
+    if short_texts:
+        store = get_index("short", short_texts, source=CHAT_FILE, precomputed=short_pre)
+        corpora.append(("short", store, short_texts, k_short))
     if summaries:
-        store = load_faiss_index(summaries)
-        D, I = store.index.search(
-            np.array([BGEEmbeddings().embed_query(user_query)]), k=k_long
-        )
+        store = get_index(long_name, summaries, source=LONG_TERM_FILE, precomputed=long_pre)
+        corpora.append(("long", store, summaries, k_long))
+    results = search_many([c[1] for c in corpora], qvec, [c[3] for c in corpora])
+
+    matches: dict[str, List[str]] = {"short": [], "long": []}
+    for (tag, _, texts, _), (D, I) in zip(corpora, results):
         for idx, score in zip(I[0], D[0]):
             if idx >= 0 and score >= score_threshold:
-                long_matches.append(summaries[idx])
+                matches[tag].append(texts[idx])
 
-    return short_matches, long_matches
+    return matches["short"], matches["long"]
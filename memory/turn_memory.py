@@ -1,5 +1,9 @@
-# memory/turn_memory.py (Unchanged, but now properly used in app.py)
-import json, datetime
+# memory/turn_memory.py
+import atexit
+import datetime
+import os
+import threading
+import orjson
 from pathlib import Path
 from typing import Dict, List
 
@@ -8,6 +12,27 @@ DATA_DIR.mkdir(exist_ok=True)
 
 CHAT_FILE = DATA_DIR / "memory.jsonl"
 
+# Parsed turns + where parsing stopped, so repeat calls only read new lines
+_CACHE = {"mtime": None, "offset": 0, "data": []}
+
+# Long-lived unbuffered append handle: one write() syscall per turn
+_FH = None
+_WRITE_LOCK = threading.Lock()
+
+@atexit.register
+def _close_handle() -> None:
+    # Registered once; closes whichever handle is current at exit
+    if _FH is not None:
+        _FH.close()
+
+def _append_handle():
+    global _FH
+    if _FH is not None and os.fstat(_FH.fileno()).st_nlink == 0:
+        _FH.close()  # file was deleted/replaced underneath us
+    if _FH is None or _FH.closed:
+        _FH = CHAT_FILE.open("ab", buffering=0)
+    return _FH
+
 def dump_turn(turn: Dict[str, str]) -> None:
     """
     Save a user/assistant turn pair into memory.jsonl with timestamp.
@@ -16,18 +41,51 @@ def dump_turn(turn: Dict[str, str]) -> None:
         "timestamp": datetime.datetime.utcnow().isoformat(timespec="seconds"),
         "turn": turn,
     }
-    with CHAT_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    line = orjson.dumps(entry) + b"\n"
+    with _WRITE_LOCK:
+        fh = _append_handle()
+        size_before = os.fstat(fh.fileno()).st_size
+        fh.write(line)
+        # Keep the load_memory cache warm if it was already up to date
+        if _CACHE["offset"] == size_before:
+            stat = os.fstat(fh.fileno())
+            _CACHE.update(
+                mtime=stat.st_mtime_ns,
+                offset=stat.st_size,
+                data=_CACHE["data"] + [turn],
+            )
 
 def load_memory() -> List[Dict[str, str]]:
-    if not CHAT_FILE.exists():
+    """
+    Return all stored turns. The list is cached and shared between callers
+    (treat it as read-only); appended lines are parsed incrementally.
+    """
+    try:
+        stat = CHAT_FILE.stat()
+    except FileNotFoundError:
+        _CACHE.update(mtime=None, offset=0, data=[])
         return []
+    if stat.st_mtime_ns == _CACHE["mtime"] and stat.st_size == _CACHE["offset"]:
+        return _CACHE["data"]
     try:
-        return [
-            json.loads(line)["turn"]
-            for line in CHAT_FILE.read_text(encoding="utf-8").splitlines()
+        if stat.st_size > _CACHE["offset"]:
+            # Appended since last read: parse only the tail
+            offset, data = _CACHE["offset"], _CACHE["data"]
+        else:
+            # Truncated or rewritten: start over
+            offset, data = 0, []
+        with CHAT_FILE.open("rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1  # leave a half-written last line for next time
+        new_turns = [
+            orjson.loads(line)["turn"]
+            for line in chunk[:end].splitlines()
             if line.strip()
         ]
+        data = data + new_turns
+        _CACHE.update(mtime=stat.st_mtime_ns, offset=offset + end, data=data)
+        return data
     except Exception as e:
         print(f"[Memory Load Error]: {e}")
         return []
@@ -4,166 +4,410 @@ Enhanced emotion and toxicity detection pipeline for hormone system integration.
 Uses transformers models for ML-based sentiment analysis.
 """
 
-from transformers import pipeline
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+import os
 import re
-from typing import List, Dict, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Union
 from pathlib import Path
 import json
 
+# Optional ONNX Runtime backend: pip install "optimum[onnxruntime]".
+# Set BOT_SENTIMENT_ONNX=0 to stay on PyTorch.
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:
+    ORTModelForSequenceClassification = None
+
+_USE_ONNX = ORTModelForSequenceClassification is not None and os.getenv("BOT_SENTIMENT_ONNX", "1") != "0"
+_ONNX_CACHE_DIR = Path.home() / ".cache" / "bot_sentiment"
+
+# Classifier checkpoints; override with any text-classification model on the Hub
+# (e.g. a distilled MiniLM) via BOT_EMOTION_MODEL / BOT_TOXICITY_MODEL.
+# The emotion model's labels should match hormone_adjuster._EMOTION_HORMONE_MAP.
+EMOTION_MODEL_ID = os.getenv("BOT_EMOTION_MODEL", "bhadresh-savani/distilbert-base-uncased-emotion")
+TOXICITY_MODEL_ID = os.getenv("BOT_TOXICITY_MODEL", "unitary/unbiased-toxic-roberta")
+# Toxicity-model labels counted as toxic (comma-separated, exact match).
+# The default "TOXIC" is not a label unbiased-toxic-roberta emits, so out of the box
+# toxicity never fires and hormones react to emotions only. Setting it to the model's
+# label (BOT_TOXIC_LABELS=toxicity, or "toxic" for martin-ha/toxic-comment-model)
+# turns toxicity-driven hormone changes and the confidence boost on.
+_TOXIC_LABELS = frozenset(os.getenv("BOT_TOXIC_LABELS", "TOXIC").split(","))
+
+# torch.compile for the PyTorch path (ignored on ONNX Runtime); BOT_TORCH_COMPILE=0 disables.
+# Compiled graphs are also saved to _COMPILE_CACHE_DIR so later processes skip recompiling.
+_USE_TORCH_COMPILE = hasattr(torch, "compile") and os.getenv("BOT_TORCH_COMPILE", "1") != "0"
+_COMPILE_CACHE_DIR = Path.home() / ".cache" / "bot_compile"
+
 # Initialize models (lazy loading to avoid startup delays)
 _goemotions_pipeline = None
 _toxicity_pipeline = None
 
+# Chat messages rarely need more; truncation keeps attention cost bounded for long pastes
+_MAX_SEQ_LEN = 128
+
+def _load_tokenizer(name_or_path):
+    """Rust-backed fast tokenizer, capped at _MAX_SEQ_LEN tokens."""
+    return AutoTokenizer.from_pretrained(name_or_path, use_fast=True, model_max_length=_MAX_SEQ_LEN)
+
+def _cpu_has_native_bf16() -> bool:
+    """AVX512-BF16 or AMX, where bf16 matmuls run at (at least) twice the fp32 rate."""
+    try:
+        flags = Path("/proc/cpuinfo").read_text()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+# The pipelines run on CPU; use bf16 weights where the CPU computes bf16 natively
+# (plus ipex.optimize when intel_extension_for_pytorch is installed).
+# BOT_SENTIMENT_FP32=1 forces fp32.
+_TORCH_DTYPE = (
+    torch.bfloat16
+    if os.getenv("BOT_SENTIMENT_FP32", "0") != "1" and _cpu_has_native_bf16()
+    else torch.float32
+)
+
+def _load_torch_model(model_id: str):
+    """
+    PyTorch classifier loaded straight into its final tensors (low_cpu_mem_usage).
+    safetensors checkpoints are preferred and memory-mapped, so worker
+    processes share the weight pages instead of each holding a copy.
+    """
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_id, low_cpu_mem_usage=True, torch_dtype=_TORCH_DTYPE
+    )
+    if _TORCH_DTYPE == torch.bfloat16:
+        try:
+            import intel_extension_for_pytorch as ipex
+            model = ipex.optimize(model.eval(), dtype=torch.bfloat16)
+        except ImportError:
+            pass
+    return model
+
+def _load_onnx_int8(model_id: str):
+    """Dynamically INT8-quantized ONNX export of `model_id`; exported once, then loaded from disk."""
+    save_dir = _ONNX_CACHE_DIR / model_id.replace("/", "--")
+    quantized = save_dir / "model_quantized.onnx"
+    if not quantized.exists():
+        print(f"🔄 Exporting {model_id} to INT8 ONNX (one-time)...")
+        model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+        # AVX2 kernels run on any x86-64 CPU from the last decade; VNNI CPUs still speed them up
+        qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        ORTQuantizer.from_pretrained(model).quantize(save_dir=save_dir, quantization_config=qconfig)
+        AutoTokenizer.from_pretrained(model_id).save_pretrained(save_dir)
+    model = ORTModelForSequenceClassification.from_pretrained(save_dir, file_name=quantized.name)
+    return model, _load_tokenizer(save_dir)
+
+def _build_pipeline(model_id: str):
+    """text-classification pipeline for `model_id`, on ONNX Runtime INT8 when available."""
+    if _USE_ONNX:
+        try:
+            model, tokenizer = _load_onnx_int8(model_id)
+            return pipeline("text-classification", model=model, tokenizer=tokenizer, top_k=None)
+        except Exception as e:
+            print(f"⚠️ ONNX Runtime unavailable for {model_id}, using PyTorch: {e}")
+    pipe = pipeline(
+        "text-classification",
+        model=_load_torch_model(model_id),
+        tokenizer=_load_tokenizer(model_id),
+        top_k=None  # Fixed: Use top_k=None instead of return_all_scores=True
+    )
+    if _USE_TORCH_COMPILE:
+        _load_compile_cache(model_id)
+        pipe.model = torch.compile(pipe.model, mode="reduce-overhead", fullgraph=False, dynamic=True)
+    return pipe
+
+def _compile_cache_file(model_id: str) -> Path:
+    return _COMPILE_CACHE_DIR / f"{model_id.replace('/', '--')}.bin"
+
+def _load_compile_cache(model_id: str) -> None:
+    cache_file = _compile_cache_file(model_id)
+    if not cache_file.exists() or not hasattr(torch.compiler, "load_cache_artifacts"):
+        return
+    try:
+        torch.compiler.load_cache_artifacts(cache_file.read_bytes())
+    except Exception as e:
+        print(f"⚠️ Ignoring compile cache for {model_id}: {e}")
+
+def _save_compile_cache(model_id: str) -> None:
+    if not hasattr(torch.compiler, "save_cache_artifacts"):
+        return
+    try:
+        artifacts = torch.compiler.save_cache_artifacts()
+        if artifacts:
+            _COMPILE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _compile_cache_file(model_id).write_bytes(artifacts[0])
+    except Exception as e:
+        print(f"⚠️ Could not save compile cache for {model_id}: {e}")
+
+# Two passes: the first pays lazy kernel/allocator init, the second runs the steady-state path
+_WARMUP_TEXT = "warmup sentence"
+_WARMUP_PASSES = 2
+_EMOTION_LOCK = threading.Lock()
+_TOXICITY_LOCK = threading.Lock()
+
+def _warm_passes(pipe):
+    with torch.inference_mode():
+        for _ in range(_WARMUP_PASSES):
+            pipe(_WARMUP_TEXT)
+
+def _warm(pipe, model_id: str):
+    """Run the warmup passes; these also trigger torch.compile, so fall back to eager if it fails."""
+    compiled = hasattr(pipe.model, "_orig_mod")
+    try:
+        _warm_passes(pipe)
+    except Exception as e:
+        if not compiled:
+            raise
+        print(f"⚠️ torch.compile failed for {model_id}, running eager: {e}")
+        pipe.model = pipe.model._orig_mod
+        _warm_passes(pipe)
+    else:
+        if compiled:
+            _save_compile_cache(model_id)
+    return pipe
+
 def _get_emotion_pipeline():
     """Lazy load emotion detection pipeline."""
     global _goemotions_pipeline
-    if _goemotions_pipeline is None:
-        print("🔄 Loading GoEmotions model...")
-        _goemotions_pipeline = pipeline(
-            "text-classification",
-            model="bhadresh-savani/distilbert-base-uncased-emotion",
-            top_k=None  # Fixed: Use top_k=None instead of return_all_scores=True
-        )
-        print("✅ GoEmotions model loaded")
+    with _EMOTION_LOCK:
+        if _goemotions_pipeline is None:
+            print("🔄 Loading GoEmotions model...")
+            _goemotions_pipeline = _warm(_build_pipeline(EMOTION_MODEL_ID), EMOTION_MODEL_ID)
+            print("✅ GoEmotions model loaded")
     return _goemotions_pipeline
 
 def _get_toxicity_pipeline():
     """Lazy load toxicity detection pipeline."""
     global _toxicity_pipeline
-    if _toxicity_pipeline is None:
-        print("🔄 Loading toxicity detection model...")
-        _toxicity_pipeline = pipeline(
-            "text-classification",
-            model="unitary/unbiased-toxic-roberta",
-            top_k=None  # Fixed: Use top_k=None instead of return_all_scores=True
-        )
-        print("✅ Toxicity model loaded")
+    with _TOXICITY_LOCK:
+        if _toxicity_pipeline is None:
+            print("🔄 Loading toxicity detection model...")
+            _toxicity_pipeline = _warm(_build_pipeline(TOXICITY_MODEL_ID), TOXICITY_MODEL_ID)
+            print("✅ Toxicity model loaded")
     return _toxicity_pipeline
 
+# Model names used by persona.emotion_service's /classify endpoint
+PIPELINES = {"emotion": _get_emotion_pipeline, "toxicity": _get_toxicity_pipeline}
+_PIPELINE_NAMES = {getter: name for name, getter in PIPELINES.items()}
+
+# Optional shared inference server (python -m persona.emotion_service). When
+# BOT_EMOTION_SERVICE_URL is set, forwards are sent there and this process
+# never loads the models itself.
+_SERVICE_URL = os.getenv("BOT_EMOTION_SERVICE_URL")
+_SERVICE_TIMEOUT = 30
+_SERVICE_SESSION = None
+
+# Normalize common contractions for better context understanding
+_CONTRACTIONS = {
+    "you're": "you are", "don't": "do not", "can't": "cannot",
+    "won't": "will not", "i'm": "i am", "it's": "it is",
+    "that's": "that is", "we're": "we are", "they're": "they are"
+}
+_CONTRACTION_RE = re.compile(
+    r'\b(' + '|'.join(map(re.escape, _CONTRACTIONS)) + r')\b', re.IGNORECASE
+)
+_MULTI_BANG = re.compile(r'[!]{2,}')
+_MULTI_QUEST = re.compile(r'[?]{2,}')
+_MULTI_DOT = re.compile(r'\.{3,}')
+
+# Hedging phrases that mark a message as ambiguous; matched as plain substrings in one scan
+_AMBIGUOUS_PHRASES = frozenset({"i guess", "maybe", "sort of", "kind of", "perhaps", "might be"})
+_AMBIG_RE = re.compile('|'.join(map(re.escape, sorted(_AMBIGUOUS_PHRASES))), re.IGNORECASE)
+
+# analyze_sentiment_confidence() parameters
+_EMOTION_WEIGHT, _QUALITY_WEIGHT, _AMBIG_WEIGHT = 0.4, 0.3, 0.3  # overall = weighted sum
+_SHORT_TEXT_QUALITY = 0.3    # single word
+_MEDIUM_TEXT_QUALITY = 0.6   # 2-4 words
+_AMBIGUOUS_CONTEXT = 0.4     # context_ambiguity when a hedging phrase is present
+_CLEAR_CONTEXT = 0.8         # ... and when none is
+_TOXIC_BOOST_THRESHOLD = 0.7  # toxicity this clear lifts overall confidence ...
+_TOXIC_BOOST_FLOOR = 0.8      # ... to at least this
+
+@lru_cache(maxsize=4096)
 def preprocess_text(text: str) -> str:
     """Clean and normalize text for better analysis."""
     if not text or not text.strip():
         return ""
     
     # Remove excessive punctuation while preserving emotional indicators
-    text = re.sub(r'[!]{2,}', '!', text)  # Multiple ! to single !
-    text = re.sub(r'[?]{2,}', '?', text)  # Multiple ? to single ?
-    text = re.sub(r'\.{3,}', '...', text)  # Multiple dots to ellipsis
-    
-    # Normalize common contractions for better context understanding
-    contractions = {
-        "you're": "you are", "don't": "do not", "can't": "cannot",
-        "won't": "will not", "i'm": "i am", "it's": "it is",
-        "that's": "that is", "we're": "we are", "they're": "they are"
-    }
+    text = _MULTI_BANG.sub('!', text)  # Multiple ! to single !
+    text = _MULTI_QUEST.sub('?', text)  # Multiple ? to single ?
+    text = _MULTI_DOT.sub('...', text)  # Multiple dots to ellipsis
     
     # Preserve original case for better model performance, but use normalized contractions
-    for contraction, expansion in contractions.items():
-        text = re.sub(r'\b' + re.escape(contraction) + r'\b', expansion, text, flags=re.IGNORECASE)
+    text = _CONTRACTION_RE.sub(lambda m: _CONTRACTIONS[m.group(1).lower()], text)
     
     return text.strip()
 
-def detect_emotion(text: str, min_confidence: float = 0.1) -> List[Dict]:
+_BATCH_SIZE = 32
+# Recent label scores per model, keyed on preprocessed text (oldest evicted first)
+_SCORE_CACHE_SIZE = 1024
+_SCORE_CACHES: Dict[object, "OrderedDict[str, tuple]"] = {}
+_SCORE_CACHE_LOCK = threading.Lock()
+_NOT_TOXIC = {"is_toxic": False, "score": 0.0, "label": "NOT_TOXIC"}
+
+def _local_scores(get_pipeline, processed: List[str]) -> List[List[Dict]]:
+    """One batched forward of this process's pipeline; a list of {label, score} per text."""
+    pipe = get_pipeline()
+    with torch.inference_mode():
+        results = pipe(processed, batch_size=_BATCH_SIZE, truncation=True)
+    # With top_k=None a list input yields one list of {label, score} per text
+    return [result if isinstance(result, list) else [result] for result in results]
+
+def _remote_scores(get_pipeline, processed: List[str]) -> List[List[Dict]]:
+    """Same as _local_scores(), computed by the shared persona.emotion_service process."""
+    global _SERVICE_SESSION
+    if _SERVICE_SESSION is None:
+        import requests
+        _SERVICE_SESSION = requests.Session()
+    response = _SERVICE_SESSION.post(
+        f"{_SERVICE_URL.rstrip('/')}/classify",
+        json={"model": _PIPELINE_NAMES[get_pipeline], "texts": processed},
+        timeout=_SERVICE_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()["scores"]
+
+def _classify(get_pipeline, processed: List[str]) -> List[List[Dict]]:
+    """
+    Run the already-preprocessed texts the model has not seen recently through
+    the pipeline in one batched call. Returns the raw label scores per input
+    ([] for empty input). Scores are memoized per preprocessed text, so resent
+    or repeated messages skip the forward pass.
     """
-    Enhanced emotion detection with preprocessing and filtering.
+    with _SCORE_CACHE_LOCK:
+        cache = _SCORE_CACHES.setdefault(get_pipeline, OrderedDict())
+        known = {}
+        for t in processed:
+            if t and t in cache:
+                cache.move_to_end(t)
+                known[t] = cache[t]
+
+    misses = [t for t in dict.fromkeys(processed) if t and t not in known]
+    if misses:
+        scores = _remote_scores(get_pipeline, misses) if _SERVICE_URL else _local_scores(get_pipeline, misses)
+        fresh = {
+            t: tuple((r["label"], r["score"]) for r in result)
+            for t, result in zip(misses, scores)
+        }
+        known.update(fresh)
+        with _SCORE_CACHE_LOCK:
+            cache.update(fresh)
+            while len(cache) > _SCORE_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    return [[{"label": l, "score": sc} for l, sc in known[t]] if t else [] for t in processed]
+
+def _run_emotion(processed: List[str], min_confidence: float = 0.1) -> List[List[Dict]]:
+    """Emotions per preprocessed text, filtered by confidence and sorted highest first."""
+    try:
+        all_scores = _classify(_get_emotion_pipeline, processed)
+    except Exception as e:
+        print(f"[Emotion Detection Error]: {e}")
+        return [[] for _ in processed]
+
+    batch = []
+    for emotion_scores in all_scores:
+        emotions = [
+            {"label": result["label"], "score": result["score"]}
+            for result in emotion_scores
+            if result["score"] > min_confidence
+        ]
+        # Sort by confidence (highest first)
+        emotions.sort(key=lambda x: x["score"], reverse=True)
+        batch.append(emotions)
+    return batch
+
+def _run_toxicity(processed: List[str], min_confidence: float = 0.3) -> List[Dict]:
+    """Toxicity dict per preprocessed text."""
+    try:
+        all_scores = _classify(_get_toxicity_pipeline, processed)
+    except Exception as e:
+        print(f"[Toxicity Detection Error]: {e}")
+        return [dict(_NOT_TOXIC) for _ in processed]
+
+    batch = []
+    for toxicity_scores in all_scores:
+        # Find the TOXIC label result
+        toxicity = dict(_NOT_TOXIC)
+        for result in toxicity_scores:
+            if result["label"] in _TOXIC_LABELS:
+                toxicity["score"] = result["score"]
+                if result["score"] > min_confidence:
+                    toxicity["is_toxic"] = True
+                    toxicity["label"] = "TOXIC"
+                break
+        batch.append(toxicity)
+    return batch
+
+def detect_emotion_batch(texts: List[str], min_confidence: float = 0.1) -> List[List[Dict]]:
+    """
+    Enhanced emotion detection with preprocessing and filtering, for many texts at once.
     
     Args:
-        text: Input text to analyze
+        texts: Input texts to analyze
         min_confidence: Minimum confidence threshold for including emotions
     
     Returns:
-        List of detected emotions with labels and scores, sorted by confidence
+        One list of detected emotions per text, each sorted by confidence
     """
-    if not text or not text.strip():
-        return []
-    
-    processed_text = preprocess_text(text)
-    if not processed_text:
-        return []
-    
-    try:
-        pipeline = _get_emotion_pipeline()
-        results = pipeline(processed_text)
-        
-        # FIXED: Handle the correct pipeline output format
-        # When top_k=None, results is a list of dictionaries for a single input
-        if isinstance(results, list) and len(results) > 0 and isinstance(results[0], list):
-            emotion_scores = results[0]  # Get scores for our single input
-        elif isinstance(results, list):
-            emotion_scores = results  # Already in the right format
-        else:
-            emotion_scores = [results]  # Single result
-        
-        # Filter and process results
-        emotions = []
-        for result in emotion_scores:
-            if result["score"] > min_confidence:
-                emotions.append({
-                    "label": result["label"],
-                    "score": result["score"]
-                })
-        
-        # Sort by confidence (highest first)
-        emotions.sort(key=lambda x: x["score"], reverse=True)
-        return emotions
-        
-    except Exception as e:
-        print(f"[Emotion Detection Error]: {e}")
-        return []
+    return _run_emotion([preprocess_text(t) for t in texts], min_confidence)
+
+def detect_emotion(text: str, min_confidence: float = 0.1) -> List[Dict]:
+    """Single-text form of detect_emotion_batch()."""
+    return detect_emotion_batch([text], min_confidence)[0]
 
-def detect_toxicity(text: str, min_confidence: float = 0.3) -> List[Dict]:
+def detect_toxicity_batch(texts: List[str], min_confidence: float = 0.3) -> List[Dict]:
     """
-    Enhanced toxicity detection with context awareness.
+    Enhanced toxicity detection with context awareness, for many texts at once.
     
     Args:
-        text: Input text to analyze
+        texts: Input texts to analyze
         min_confidence: Minimum confidence threshold for toxicity detection
     
     Returns:
-        Dictionary with toxicity information
+        One toxicity dictionary per text
     """
-    if not text or not text.strip():
-        return {"is_toxic": False, "score": 0.0, "label": "NOT_TOXIC"}
-    
-    processed_text = preprocess_text(text)
-    if not processed_text:
-        return {"is_toxic": False, "score": 0.0, "label": "NOT_TOXIC"}
+    return _run_toxicity([preprocess_text(t) for t in texts], min_confidence)
+
+def detect_toxicity(text: str, min_confidence: float = 0.3) -> Dict:
+    """Single-text form of detect_toxicity_batch()."""
+    return detect_toxicity_batch([text], min_confidence)[0]
+
+# Runs the two models side by side; torch releases the GIL inside the forward pass
+_MODEL_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sentiment-model")
+
+def warmup_pipelines() -> None:
+    """Load and warm both models now (concurrently) instead of on the first analyzed message."""
+    if _SERVICE_URL:
+        return  # the service process owns (and has warmed) the models
+    futures = [_MODEL_POOL.submit(_get_emotion_pipeline), _MODEL_POOL.submit(_get_toxicity_pipeline)]
+    for fut in futures:
+        try:
+            fut.result()
+        except Exception as e:
+            print(f"[Sentiment Warmup Error]: {e}")
+
+def analyze_texts(texts: List[str]) -> List[Dict]:
+    """
+    Preprocess each text once and run both models on the result concurrently.
     
-    try:
-        pipeline = _get_toxicity_pipeline()
-        results = pipeline(processed_text)
-        
-        # FIXED: Handle the correct pipeline output format for toxicity model
-        # The unitary/unbiased-toxic-roberta model returns TOXIC/NOT_TOXIC labels
-        if isinstance(results, list) and len(results) > 0 and isinstance(results[0], list):
-            toxicity_scores = results[0]  # Get scores for our single input
-        elif isinstance(results, list):
-            toxicity_scores = results  # Already in the right format
-        else:
-            toxicity_scores = [results]  # Single result
-        
-        # Find the TOXIC label result
-        toxic_score = 0.0
-        is_toxic = False
-        toxic_label = "NOT_TOXIC"
-        
-        for result in toxicity_scores:
-            if result["label"] == "TOXIC":
-                toxic_score = result["score"]
-                if toxic_score > min_confidence:
-                    is_toxic = True
-                    toxic_label = "TOXIC"
-                break
-        
-        return {
-            "is_toxic": is_toxic,
-            "score": toxic_score,
-            "label": toxic_label
-        }
-        
-    except Exception as e:
-        print(f"[Toxicity Detection Error]: {e}")
-        return {"is_toxic": False, "score": 0.0, "label": "NOT_TOXIC"}
+    Returns:
+        One {"processed", "emotions", "toxicity"} dict per text
+    """
+    processed = [preprocess_text(t) for t in texts]
+    emotions = _MODEL_POOL.submit(_run_emotion, processed)
+    toxicity = _MODEL_POOL.submit(_run_toxicity, processed)
+    return [
+        {"processed": p, "emotions": e, "toxicity": x}
+        for p, e, x in zip(processed, emotions.result(), toxicity.result())
+    ]
 
 def analyze_sentiment_confidence(text: str, emotions: List[Dict], toxicity: Dict) -> Dict:
     """
@@ -201,16 +445,15 @@ def analyze_sentiment_confidence(text: str, emotions: List[Dict], toxicity: Dict
         if word_count >= 5:
             confidence_metrics["text_quality"] = min(1.0, word_count / 10)
         elif word_count >= 2:
-            confidence_metrics["text_quality"] = 0.6
+            confidence_metrics["text_quality"] = _MEDIUM_TEXT_QUALITY
         else:
-            confidence_metrics["text_quality"] = 0.3  # Very short text
+            confidence_metrics["text_quality"] = _SHORT_TEXT_QUALITY  # Very short text
     
     # Check for context ambiguity markers
-    ambiguous_phrases = ["i guess", "maybe", "sort of", "kind of", "perhaps", "might be"]
-    if any(phrase in text.lower() for phrase in ambiguous_phrases):
-        confidence_metrics["context_ambiguity"] = 0.4
+    if _AMBIG_RE.search(text) is not None:
+        confidence_metrics["context_ambiguity"] = _AMBIGUOUS_CONTEXT
     else:
-        confidence_metrics["context_ambiguity"] = 0.8
+        confidence_metrics["context_ambiguity"] = _CLEAR_CONTEXT
     
     # Calculate toxicity confidence
     if toxicity and toxicity.get("is_toxic", False):
@@ -220,44 +463,46 @@ def analyze_sentiment_confidence(text: str, emotions: List[Dict], toxicity: Dict
     
     # Calculate overall confidence
     base_confidence = (
-        confidence_metrics["emotion_clarity"] * 0.4 +
-        confidence_metrics["text_quality"] * 0.3 +
-        confidence_metrics["context_ambiguity"] * 0.3
+        confidence_metrics["emotion_clarity"] * _EMOTION_WEIGHT +
+        confidence_metrics["text_quality"] * _QUALITY_WEIGHT +
+        confidence_metrics["context_ambiguity"] * _AMBIG_WEIGHT
     )
     
     # Boost confidence if we have clear toxicity signals
-    if confidence_metrics["toxicity_confidence"] > 0.7:
-        base_confidence = max(base_confidence, 0.8)
+    if confidence_metrics["toxicity_confidence"] > _TOXIC_BOOST_THRESHOLD:
+        base_confidence = max(base_confidence, _TOXIC_BOOST_FLOOR)
     
     confidence_metrics["overall_confidence"] = min(1.0, base_confidence)
     
     return confidence_metrics
 
-def get_emotional_summary(text: str) -> Dict:
+def get_emotional_summary(text: Union[str, List[str]]) -> Union[Dict, List[Dict]]:
     """
     Get a comprehensive emotional analysis summary for debugging and logging.
     
     Args:
-        text: Text to analyze
+        text: Text to analyze, or a list of texts (analyzed in one batch)
     
     Returns:
-        Complete analysis summary
+        Complete analysis summary (a list of them for list input)
     """
-    emotions = detect_emotion(text)
-    toxicity = detect_toxicity(text)
-    confidence = analyze_sentiment_confidence(text, emotions, toxicity)
-    
-    return {
-        "original_text": text,
-        "processed_text": preprocess_text(text),
-        "emotions": emotions,
-        "toxicity": toxicity,
-        "confidence": confidence,
-        "primary_emotion": emotions[0]["label"] if emotions else "neutral",
-        "primary_emotion_score": emotions[0]["score"] if emotions else 0.0,
-        "is_toxic": toxicity.get("is_toxic", False),
-        "max_toxicity_score": toxicity.get("score", 0.0)
-    }
+    texts = [text] if isinstance(text, str) else list(text)
+    summaries = []
+    for t, analysis in zip(texts, analyze_texts(texts)):
+        emotions, toxicity = analysis["emotions"], analysis["toxicity"]
+        confidence = analyze_sentiment_confidence(t, emotions, toxicity)
+        summaries.append({
+            "original_text": t,
+            "processed_text": analysis["processed"],
+            "emotions": emotions,
+            "toxicity": toxicity,
+            "confidence": confidence,
+            "primary_emotion": emotions[0]["label"] if emotions else "neutral",
+            "primary_emotion_score": emotions[0]["score"] if emotions else 0.0,
+            "is_toxic": toxicity.get("is_toxic", False),
+            "max_toxicity_score": toxicity.get("score", 0.0)
+        })
+    return summaries[0] if isinstance(text, str) else summaries
 
 # CLI testing interface
 def main():
@@ -0,0 +1,124 @@
+# persona/emotion_service.py
+"""
+Shared emotion/toxicity inference server.
+One process owns the classifier models; the app, CLI tools and scripts point
+BOT_EMOTION_SERVICE_URL at it instead of each loading their own copies:
+
+    python -m persona.emotion_service --port 8765
+    BOT_EMOTION_SERVICE_URL=http://127.0.0.1:8765 streamlit run app.py
+
+POST /classify  {"model": "emotion" | "toxicity", "texts": [preprocessed text, ...]}
+            ->  {"scores": [[{"label": ..., "score": ...}, ...], ...]}
+
+Requests for the same model that arrive within BATCH_WINDOW of each other are
+run as one batched forward pass.
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+from .emotion_nsfw_checker import PIPELINES, _local_scores, warmup_pipelines
+
+BATCH_WINDOW = 0.010  # seconds to wait for more requests after the first one
+MAX_REQUESTS = 16
+
+
+class _BatchQueue:
+    """Coalesces concurrent /classify requests for one model into single forwards."""
+
+    def __init__(self, get_pipeline):
+        self._get_pipeline = get_pipeline
+        self._pending: "queue.Queue[tuple[List[str], Future]]" = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, texts: List[str]) -> Future:
+        fut: Future = Future()
+        self._pending.put((texts, fut))
+        return fut
+
+    def _drain(self):
+        batch = [self._pending.get()]
+        deadline = time.monotonic() + BATCH_WINDOW
+        while len(batch) < MAX_REQUESTS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            flat = [t for texts, _ in batch for t in texts]
+            try:
+                scores = _local_scores(self._get_pipeline, flat) if flat else []
+            except Exception as e:
+                print(f"[Emotion Service Error]: {e}")
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            start = 0
+            for texts, fut in batch:
+                fut.set_result(scores[start:start + len(texts)])
+                start += len(texts)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    queues: Dict[str, _BatchQueue] = {}
+
+    def do_POST(self):
+        if self.path != "/classify":
+            return self._reply(404, {"error": "not found"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            batch_queue = self.queues[body["model"]]
+            texts = [str(t) for t in body["texts"]]
+        except (ValueError, KeyError, TypeError) as e:
+            return self._reply(400, {"error": f"bad request: {e}"})
+        try:
+            scores = batch_queue.submit(texts).result()
+        except Exception as e:
+            return self._reply(500, {"error": str(e)})
+        self._reply(200, {"scores": scores})
+
+    def _reply(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would drown the model logs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared emotion/toxicity inference server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    warmup_pipelines()
+    _Handler.queues = {name: _BatchQueue(getter) for name, getter in PIPELINES.items()}
+    server = ThreadingHTTPServer((args.host, args.port), _Handler)
+    print(f"✅ Emotion service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,23 @@ Uses emotion_nsfw_checker pipeline for emotion detection instead of hardcoded pa
 from __future__ import annotations
 
 import json
+import logging
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Union
 import random
 
+import numpy as np
+
+try:  # optional: JIT-compiles the hormone update kernel below
+    import numba
+except ImportError:
+    numba = None
+
 # Import from neutral API module to avoid circular imports
 from .hormone_api import (
+    HORMONE_NAMES,
+    load_hormone_array,
+    save_hormone_array,
     load_hormone_levels,
     save_hormone_levels,
     load_mood_weights,
@@ -21,7 +32,10 @@ from .hormone_api import (
 )
 
 # Import emotion detection pipeline
-from .emotion_nsfw_checker import detect_emotion, detect_toxicity, analyze_sentiment_confidence
+from .emotion_nsfw_checker import analyze_texts, analyze_sentiment_confidence
+
+# Per-message diagnostics go to DEBUG so formatting is skipped when it is off
+log = logging.getLogger(__name__)
 
 # ---------------------- Emotion-to-Hormone Mapping --------------------- #
 _EMOTION_HORMONE_MAP = {
@@ -67,27 +81,113 @@ _TOXICITY_HORMONE_MAP = {
     "identity_hate": {"cortisol": 0.15, "serotonin": -0.10}
 }
 
+# ---------------------- Mappings as Delta Matrices -------------------- #
+def _map_to_matrix(mapping: Dict[str, Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
+    """
+    One row of hormone deltas (HORMONE_NAMES order) per label, a mask of the
+    hormones each label touches, and the label -> row index.
+    """
+    index = {label: i for i, label in enumerate(mapping)}
+    matrix = np.zeros((len(mapping), len(HORMONE_NAMES)), dtype=np.float64)
+    touched = np.zeros(matrix.shape, dtype=bool)
+    for label, deltas in mapping.items():
+        for hormone, delta in deltas.items():
+            col = HORMONE_NAMES.index(hormone)
+            matrix[index[label], col] = delta
+            touched[index[label], col] = True
+    return matrix, touched, index
+
+_EMO_MAT, _EMO_TOUCHED, _EMO_IDX = _map_to_matrix(_EMOTION_HORMONE_MAP)
+_TOX_MAT, _TOX_TOUCHED, _TOX_IDX = _map_to_matrix(_TOXICITY_HORMONE_MAP)
+
 # ------------------------- Processing Parameters ------------------- #
 _RATE_LIMIT = 0.08  # Increased from 0.05 for more responsive changes
 _DECAY_STEP = 0.01  # Decay toward baseline when neutral
 _CONFIDENCE_THRESHOLD = 0.3  # Minimum confidence to apply changes
 _TOXICITY_THRESHOLD = 0.5  # Minimum toxicity score to trigger
+# Empty messages and these content-free fillers skip the models (fast path);
+# any other message, including one-word ones like "love" or "idiot", is classified.
+_FILLER_MESSAGES = frozenset({"ok", "okay", "k", "kk", "lol", "hi", "hm", "hmm"})
+_NEUTRAL_DETECTION = {"emotions": [], "toxicity": {"is_toxic": False, "score": 0.0, "label": "NOT_TOXIC"}}
 
-def _apply_resistance(current: float, delta: float) -> float:
-    """Smaller effective change near extremes (0/1)."""
+def _apply_resistance(current, delta):
+    """Smaller effective change near extremes (0/1). Works on floats or element-wise on arrays."""
     distance = 1 - abs(current - 0.5) * 2  # 1 at mid, 0 at extremes
     return delta * (0.4 + 0.6 * distance)  # min 40% efficacy at extremes
 
-def analyze_contextual_sentiment(text: str) -> dict:
+def _update_hormones_np(current, delta, touched, rate_limit, decay_step, neutral):
+    """
+    One hormone update step. Returns (updated levels, applied deltas).
+    neutral: decay every level toward 0.5 by decay_step.
+    otherwise: rate-limit, apply resistance and clip the touched levels.
+    """
+    if neutral:
+        offset = current - 0.5
+        updated = np.where(np.abs(offset) < decay_step, 0.5, current - np.sign(offset) * decay_step)
+        return updated, updated - current
+    applied = _apply_resistance(current, np.clip(delta, -rate_limit, rate_limit))
+    applied = np.where(touched, applied, 0.0)
+    updated = np.where(touched, np.clip(current + applied, 0.0, 1.0), current)
+    return updated, applied
+
+def _update_hormones_loop(current, delta, touched, rate_limit, decay_step, neutral):
+    """Scalar-loop form of _update_hormones_np(), for numba to compile."""
+    updated = current.copy()
+    applied = np.zeros_like(current)
+    for i in range(current.shape[0]):
+        if neutral:
+            offset = current[i] - 0.5
+            if abs(offset) < decay_step:
+                updated[i] = 0.5
+            elif offset > 0:
+                updated[i] = current[i] - decay_step
+            else:
+                updated[i] = current[i] + decay_step
+            applied[i] = updated[i] - current[i]
+        elif touched[i]:
+            d = min(max(delta[i], -rate_limit), rate_limit)
+            d *= 0.4 + 0.6 * (1.0 - abs(current[i] - 0.5) * 2.0)
+            applied[i] = d
+            updated[i] = min(max(current[i] + d, 0.0), 1.0)
+    return updated, applied
+
+if numba is not None:
+    # No fastmath: the clamps and the neutral-decay comparison must match _update_hormones_np() exactly
+    _update_hormones = numba.njit(cache=True)(_update_hormones_loop)
+    # Compile now (or load from the on-disk cache) rather than on the first message
+    _update_hormones(np.full(4, 0.5), np.zeros(4), np.zeros(4, dtype=np.bool_), 0.08, 0.01, False)
+else:
+    _update_hormones = _update_hormones_np
+
+def _is_filler(text: str) -> bool:
+    """Empty, or a filler word with optional trailing punctuation ("ok.", "lol!")."""
+    word = text.strip().lower().rstrip(".!?")
+    return not word or word in _FILLER_MESSAGES
+
+def analyze_contextual_sentiment(text: Union[str, List[str]], fast_path: bool = True) -> Union[dict, List[dict]]:
     """
     ML-based contextual sentiment analysis using emotion detection pipeline.
     Returns emotion analysis, toxicity analysis, and hormone adjustment recommendations.
+    A list of texts is run through both models as one batch and gives a list of results.
+    With fast_path, empty messages and _FILLER_MESSAGES ("ok", "lol") skip the
+    models and are treated as neutral.
     """
-    print(f"[ML Sentiment]: Analyzing text: '{text}'")
+    texts = [text] if isinstance(text, str) else list(text)
+    if fast_path:
+        to_model = [t for t in texts if not _is_filler(t)]
+    else:
+        to_model = texts
+    detections = dict(zip(to_model, analyze_texts(to_model))) if to_model else {}
+    results = []
+    for t in texts:
+        a = detections.get(t, _NEUTRAL_DETECTION)
+        results.append(_sentiment_from_detections(t, a["emotions"], dict(a["toxicity"])))
+    return results[0] if isinstance(text, str) else results
+
+def _sentiment_from_detections(text: str, emotions: List[Dict], toxicity_result: Dict) -> dict:
+    """Turn one text's emotion/toxicity detections into the analysis dict."""
+    log.debug("[ML Sentiment]: Analyzing text: '%s'", text)
     
-    # Get emotion detection results
-    emotions = detect_emotion(text)
-    toxicity_result = detect_toxicity(text)  # This returns a single dict, not a list
     confidence = analyze_sentiment_confidence(text, emotions, toxicity_result)
     
     # Determine primary emotion
@@ -96,10 +196,10 @@ def analyze_contextual_sentiment(text: str) -> dict:
     if emotions and confidence["overall_confidence"] > _CONFIDENCE_THRESHOLD:
         primary_emotion = emotions[0]["label"].lower()
         emotion_intensity = emotions[0]["score"]
-        print(f"[ML Sentiment]: Primary emotion: {primary_emotion} (confidence: {emotion_intensity:.3f})")
+        log.debug("[ML Sentiment]: Primary emotion: %s (confidence: %.3f)", primary_emotion, emotion_intensity)
     else:
         primary_emotion = "neutral"
-        print(f"[ML Sentiment]: Low confidence or no strong emotions detected")
+        log.debug("[ML Sentiment]: Low confidence or no strong emotions detected")
     
     # FIXED: Check for toxicity - toxicity_result is a single dict, not a list
     toxicity_detected = []
@@ -112,33 +212,36 @@ def analyze_contextual_sentiment(text: str) -> dict:
         if toxic_score > _TOXICITY_THRESHOLD:
             toxicity_detected.append(toxic_label)
             max_toxicity_score = toxic_score
-            print(f"[ML Sentiment]: Toxicity detected: {toxic_label} (score: {toxic_score:.3f})")
+            log.debug("[ML Sentiment]: Toxicity detected: %s (score: %.3f)", toxic_label, toxic_score)
     
-    # Calculate hormone adjustments
-    hormone_deltas = {}
+    # Calculate hormone adjustments (one HORMONE_NAMES-ordered vector)
+    deltas = np.zeros(len(HORMONE_NAMES))
+    touched = np.zeros(len(HORMONE_NAMES), dtype=bool)
     adjustment_reasons = []
     
-    # Apply emotion-based adjustments
-    if primary_emotion in _EMOTION_HORMONE_MAP:
-        emotion_deltas = _EMOTION_HORMONE_MAP[primary_emotion]
-        for hormone, base_delta in emotion_deltas.items():
-            # Scale by emotion intensity and confidence
-            scaled_delta = base_delta * emotion_intensity * confidence["overall_confidence"]
-            hormone_deltas[hormone] = hormone_deltas.get(hormone, 0) + scaled_delta
+    # Apply emotion-based adjustments, scaled by emotion intensity and confidence
+    if primary_emotion in _EMO_IDX:
+        row = _EMO_IDX[primary_emotion]
+        deltas += _EMO_MAT[row] * (emotion_intensity * confidence["overall_confidence"])
+        touched |= _EMO_TOUCHED[row]
         adjustment_reasons.append(f"emotion_{primary_emotion}")
     
     # Apply toxicity-based adjustments (overrides emotion if stronger)
     if toxicity_detected:
         for tox_label in toxicity_detected:
-            if tox_label in _TOXICITY_HORMONE_MAP:
-                tox_deltas = _TOXICITY_HORMONE_MAP[tox_label]
-                for hormone, base_delta in tox_deltas.items():
-                    # Scale by toxicity score
-                    scaled_delta = base_delta * max_toxicity_score
-                    # Toxicity adjustments are additive (can intensify emotion adjustments)
-                    hormone_deltas[hormone] = hormone_deltas.get(hormone, 0) + scaled_delta
+            if tox_label in _TOX_IDX:
+                row = _TOX_IDX[tox_label]
+                # Scaled by toxicity score; additive (can intensify emotion adjustments)
+                deltas += _TOX_MAT[row] * max_toxicity_score
+                touched |= _TOX_TOUCHED[row]
                 adjustment_reasons.append(f"toxicity_{tox_label}")
     
+    # Only hormones a mapping touched; an empty dict means "neutral" downstream
+    hormone_deltas = {
+        hormone: float(delta)
+        for hormone, delta, hit in zip(HORMONE_NAMES, deltas, touched) if hit
+    }
+    
     return {
         "primary_emotion": primary_emotion,
         "emotion_intensity": emotion_intensity,
@@ -147,46 +250,43 @@ def analyze_contextual_sentiment(text: str) -> dict:
         "toxicity_score": max_toxicity_score,
         "confidence_metrics": confidence,
         "hormone_deltas": hormone_deltas,
+        # Same deltas as HORMONE_NAMES-ordered arrays, for the vectorized update
+        "hormone_delta_vector": deltas,
+        "hormones_touched": touched,
         "adjustment_reasons": adjustment_reasons,
         "detected_text": text
     }
 
-def apply_contextual_hormone_adjustments(text: str) -> Dict[str, float]:
+def apply_contextual_hormone_adjustments(text: str, fast_path: bool = True) -> Dict[str, float]:
     """
     Primary function for ML-based contextual hormone adjustment.
     Uses emotion detection pipeline instead of hardcoded patterns.
+    fast_path: see analyze_contextual_sentiment().
     """
-    analysis = analyze_contextual_sentiment(text)
-    hormones = load_hormone_levels()
-    updated = hormones.copy()
+    analysis = analyze_contextual_sentiment(text, fast_path=fast_path)
+    current = load_hormone_array()
     
-    print(f"[ML Hormone Adjust]: {analysis['primary_emotion']} (intensity: {analysis['emotion_intensity']:.2f})")
+    log.debug("[ML Hormone Adjust]: %s (intensity: %.2f)", analysis["primary_emotion"], analysis["emotion_intensity"])
     
     if analysis["adjustment_reasons"]:
-        print(f"[ML Hormone Adjust]: Reasons: {', '.join(analysis['adjustment_reasons'])}")
+        log.debug("[ML Hormone Adjust]: Reasons: %s", ", ".join(analysis["adjustment_reasons"]))
     
-    if analysis["hormone_deltas"]:
-        for hormone, base_delta in analysis["hormone_deltas"].items():
-            # Apply rate limiting
-            delta = max(-_RATE_LIMIT, min(_RATE_LIMIT, base_delta))
-            # Apply resistance curve
-            delta = _apply_resistance(hormones[hormone], delta)
-            # Update hormone level
-            updated[hormone] = max(0.0, min(1.0, hormones[hormone] + delta))
-            print(f"[ML Hormone Adjust]: {hormone} {hormones[hormone]:.3f} -> {updated[hormone]:.3f} (delta: {delta:+.4f})")
-    else:
-        # Neutral message → gradual decay toward baseline (0.5)
-        print("[ML Hormone Adjust]: Neutral input - applying baseline decay")
-        for hormone in updated:
-            if abs(updated[hormone] - 0.5) < _DECAY_STEP:
-                updated[hormone] = 0.5
-            elif updated[hormone] > 0.5:
-                updated[hormone] -= _DECAY_STEP
-            else:
-                updated[hormone] += _DECAY_STEP
+    hormone_deltas = analysis["hormone_deltas"]
+    touched = analysis["hormones_touched"]
+    updated, applied = _update_hormones(
+        current, analysis["hormone_delta_vector"], touched, _RATE_LIMIT, _DECAY_STEP, not hormone_deltas
+    )
+    if log.isEnabledFor(logging.DEBUG):
+        if hormone_deltas:
+            for i in np.flatnonzero(touched):
+                log.debug("[ML Hormone Adjust]: %s %.3f -> %.3f (delta: %+.4f)",
+                          HORMONE_NAMES[i], current[i], updated[i], applied[i])
+        else:
+            # Neutral message → gradual decay toward baseline (0.5)
+            log.debug("[ML Hormone Adjust]: Neutral input - applying baseline decay")
     
-    save_hormone_levels(updated)
-    return updated
+    save_hormone_array(updated)
+    return dict(zip(HORMONE_NAMES, updated.tolist()))
 
 # Legacy function mappings for compatibility
 def adjust_hormones(event: str) -> Dict[str, float]:
@@ -200,8 +300,9 @@ def adjust_hormones(event: str) -> Dict[str, float]:
     }
     
     text = event_to_text.get(event, event)
-    print(f"[Legacy Hormone Adjust]: Converting event '{event}' to text analysis")
-    return apply_contextual_hormone_adjustments(text)
+    log.debug("[Legacy Hormone Adjust]: Converting event '%s' to text analysis", event)
+    # Event names are short keywords; always run them through the models
+    return apply_contextual_hormone_adjustments(text, fast_path=False)
 
 # Re-export functions with consistent naming for backward compatibility
 load_hormones = load_hormone_levels
@@ -223,6 +324,7 @@ def get_emotion_mapping_info() -> Dict:
 
 # CLI for testing
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     print("🧪 ML-Enhanced Hormone Adjuster Demo — Type messages, 'quit' to exit")
     print("🤖 Using GoEmotions + Toxicity Detection Pipeline\n")
     
@@ -4,15 +4,28 @@ Neutral hormone API module to break circular imports.
 Contains core hormone data access functions shared across modules.
 """
 
+import atexit
 import json
+import os
+import threading
+import time
+from collections import namedtuple
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+
+import numpy as np
 
 # File paths
 PERSONA_DIR = Path("persona")
-HORMONES_FILE = PERSONA_DIR / "hormones.json"
+HORMONES_FILE = PERSONA_DIR / "hormones.npy"
+# Pre-.npy format; seeds hormones.npy on first load, then is no longer read
+LEGACY_HORMONES_FILE = PERSONA_DIR / "hormones.json"
 MOOD_WEIGHTS_FILE = PERSONA_DIR / "mood_weights.json"
 
+# Fixed storage order for the hormone array
+HORMONE_NAMES = ("dopamine", "serotonin", "cortisol", "oxytocin")
+Hormones = namedtuple("Hormones", HORMONE_NAMES)
+
 # Ensure directory exists
 PERSONA_DIR.mkdir(exist_ok=True)
 
@@ -43,20 +56,106 @@ def _ensure_file(path: Path, default: dict):
     if not path.exists():
         path.write_text(json.dumps(default, indent=2), encoding="utf-8")
 
-def load_hormone_levels() -> Dict[str, float]:
-    """Load current hormone levels from file."""
-    _ensure_file(HORMONES_FILE, _DEFAULT_HORMONES)
+def _levels_to_array(levels: Dict[str, float]) -> np.ndarray:
+    return np.array([levels.get(h, 0.5) for h in HORMONE_NAMES], dtype=np.float64)
+
+def _write_hormone_file(arr: np.ndarray):
+    # Written to a per-process temp file and renamed over the live one, so a
+    # crash mid-write never leaves a truncated .npy for the next load
+    tmp = HORMONES_FILE.with_name(f"{HORMONES_FILE.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            np.save(f, np.asarray(arr, dtype=np.float64))
+        os.replace(tmp, HORMONES_FILE)
+    except Exception as e:
+        print(f"[Hormone API Error]: Failed to save hormone levels: {e}")
+
+def _read_hormone_file() -> np.ndarray:
+    if not HORMONES_FILE.exists():
+        # First run on the .npy format: carry over the old JSON state if any
+        arr = _levels_to_array(_DEFAULT_HORMONES)
+        if LEGACY_HORMONES_FILE.exists():
+            try:
+                arr = _levels_to_array(json.loads(LEGACY_HORMONES_FILE.read_text(encoding="utf-8")))
+            except Exception:
+                pass
+        _write_hormone_file(arr)
+        return arr
     try:
-        return json.loads(HORMONES_FILE.read_text(encoding="utf-8"))
+        arr = np.load(HORMONES_FILE)
+        if arr.shape == (len(HORMONE_NAMES),):
+            return arr
     except Exception:
-        return _DEFAULT_HORMONES.copy()
+        pass
+    return _levels_to_array(_DEFAULT_HORMONES)
+
+# In-process hormone state shared by every reader/writer in this process.
+# By default every save is written straight through, and loads re-read the
+# file whenever its mtime/size changes, so other processes (each Streamlit
+# server, test_mood_fix.py and the other scripts) see the latest levels. Setting
+# BOT_HORMONE_FLUSH_EVERY > 1 opts into deferred writes for a single-process
+# deployment: saves then reach disk every FLUSH_EVERY saves, after
+# FLUSH_INTERVAL seconds, or at interpreter exit.
+FLUSH_EVERY = max(1, int(os.getenv("BOT_HORMONE_FLUSH_EVERY", "1")))
+FLUSH_INTERVAL = float(os.getenv("BOT_HORMONE_FLUSH_INTERVAL", "30"))  # seconds
+_HORMONE_CACHE: Optional[np.ndarray] = None
+_CACHE_STAMP = None  # (mtime_ns, size) of HORMONES_FILE when the cache was filled
+_DIRTY_COUNT = 0
+_LAST_FLUSH = time.monotonic()
+_HORMONE_LOCK = threading.Lock()
+
+def _file_stamp():
+    try:
+        st = os.stat(HORMONES_FILE)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+def _flush_locked():
+    global _DIRTY_COUNT, _LAST_FLUSH, _CACHE_STAMP
+    _write_hormone_file(_HORMONE_CACHE)
+    _CACHE_STAMP = _file_stamp()
+    _DIRTY_COUNT = 0
+    _LAST_FLUSH = time.monotonic()
+
+def flush_hormone_levels():
+    """Write pending hormone changes to disk now."""
+    with _HORMONE_LOCK:
+        if _DIRTY_COUNT:
+            _flush_locked()
+
+atexit.register(flush_hormone_levels)
+
+def save_hormone_array(arr: np.ndarray):
+    """Save hormone levels (HORMONE_NAMES order); persisted as a small binary .npy file."""
+    global _HORMONE_CACHE, _DIRTY_COUNT
+    with _HORMONE_LOCK:
+        _HORMONE_CACHE = np.array(arr, dtype=np.float64)
+        _DIRTY_COUNT += 1
+        if _DIRTY_COUNT >= FLUSH_EVERY or time.monotonic() - _LAST_FLUSH >= FLUSH_INTERVAL:
+            _flush_locked()
+
+def load_hormone_array() -> np.ndarray:
+    """Load current hormone levels as a float64 array in HORMONE_NAMES order."""
+    global _HORMONE_CACHE, _CACHE_STAMP
+    with _HORMONE_LOCK:
+        # Unflushed local changes win; otherwise re-read if the file moved on
+        if _HORMONE_CACHE is None or (not _DIRTY_COUNT and _file_stamp() != _CACHE_STAMP):
+            _HORMONE_CACHE = _read_hormone_file()
+            _CACHE_STAMP = _file_stamp()
+        return _HORMONE_CACHE.copy()
+
+def load_hormone_tuple() -> Hormones:
+    """Load current hormone levels as a Hormones tuple (HORMONE_NAMES order)."""
+    return Hormones(*load_hormone_array().tolist())
+
+def load_hormone_levels() -> Dict[str, float]:
+    """Load current hormone levels from file."""
+    return dict(zip(HORMONE_NAMES, load_hormone_array().tolist()))
 
 def save_hormone_levels(levels: Dict[str, float]):
     """Save hormone levels to file."""
-    try:
-        HORMONES_FILE.write_text(json.dumps(levels, indent=2), encoding="utf-8")
-    except Exception as e:
-        print(f"[Hormone API Error]: Failed to save hormone levels: {e}")
+    save_hormone_array(_levels_to_array(levels))
 
 def load_mood_weights() -> Dict:
     """Load mood weight mappings from file."""
@@ -5,222 +5,577 @@ NOW with proper mood calculation logic moved into mood_tracker.py!
 """
 
 import json
+import logging
+import os
+from collections import deque
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, Any
-from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Union
+from functools import lru_cache
+import time
+
+import numpy as np
+import orjson
+
+try:  # optional: JIT-compiles the mood scoring kernel below
+    import numba
+except ImportError:
+    numba = None
 
 # Import from neutral API module to avoid circular imports
 from .hormone_api import (
+    HORMONE_NAMES,
+    Hormones,
+    load_hormone_array,
+    load_hormone_tuple,
     load_hormone_levels,
-    save_hormone_levels, 
+    save_hormone_array,
     load_mood_weights,
     get_mood_context
 )
 
-MOOD_HISTORY_FILE = Path("persona/mood_history.json")
+log = logging.getLogger(__name__)
+
+# Append-only log, one JSON object per line; trimmed to the newest
+# MOOD_HISTORY_LIMIT entries every MOOD_HISTORY_ROTATE_EVERY appends.
+MOOD_HISTORY_FILE = Path("persona/mood_history.ndjson")
+LEGACY_MOOD_HISTORY_FILE = Path("persona/mood_history.json")  # pre-.ndjson format, migrated on first load
+MOOD_ADJUSTMENTS_FILE = Path("persona/mood_adjustments.json")
+MOOD_HISTORY_LIMIT = 100
+MOOD_HISTORY_ROTATE_EVERY = 50
+
+@dataclass(slots=True)
+class MoodEntry:
+    """One mood-history record; serialized to a JSON object only at the file boundary."""
+    timestamp: str
+    mood: str
+    intensity: float
+    reason: str = ""
+    is_hybrid: bool = False
+    is_emergent: bool = False
+    stability: str = "medium"
+    hormone_snapshot: Optional[Dict[str, float]] = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MoodEntry":
+        """Build an entry from a parsed record, ignoring unknown keys."""
+        return cls(
+            timestamp=data.get("timestamp", ""),
+            mood=data.get("mood", "neutral"),
+            intensity=data.get("intensity", 0.5),
+            reason=data.get("reason", ""),
+            is_hybrid=data.get("is_hybrid", False),
+            is_emergent=data.get("is_emergent", False),
+            stability=data.get("stability", "medium"),
+            hormone_snapshot=data.get("hormone_snapshot"),
+        )
+
+    def to_dict(self) -> dict:
+        """The record as stored in the log; unset (None) fields are left out."""
+        return {k: v for k, v in asdict(self).items() if v is not None}
+
+# Parsed JSON files keyed by path -> ((st_mtime_ns, st_size), object).
+# Reads re-parse only when the file changed on disk; our own writes refresh
+# the entry directly so they are never mistaken for stale data.
+_FILE_CACHE: Dict[Path, tuple] = {}
+_APPENDS_SINCE_ROTATE = 0
 
-def load_mood_history() -> list:
-    """Load mood history and create file if not present."""
-    if not MOOD_HISTORY_FILE.exists():
+def _file_stamp(path: Path) -> tuple:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+def _read_json(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _read_ndjson(path: Path) -> List[MoodEntry]:
+    """The newest MOOD_HISTORY_LIMIT entries; a torn last line is skipped."""
+    with open(path, "rb") as f:
+        lines = deque(f, maxlen=MOOD_HISTORY_LIMIT)
+    entries = []
+    for line in lines:
         try:
-            MOOD_HISTORY_FILE.parent.mkdir(exist_ok=True)
-            with open(MOOD_HISTORY_FILE, "w", encoding="utf-8") as f:
-                json.dump([], f)
+            entries.append(MoodEntry.from_dict(orjson.loads(line)))
+        except orjson.JSONDecodeError:
+            continue
+    return entries
+
+def _cached_load(path: Path, parse=_read_json):
+    """parse(path), skipped when the file is unchanged since the last read."""
+    stamp = _file_stamp(path)
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    data = parse(path)
+    _FILE_CACHE[path] = (stamp, data)
+    return data
+
+def _remember_json(path: Path, data):
+    """Record what we just wrote to `path` so the next read skips the parse."""
+    try:
+        _FILE_CACHE[path] = (_file_stamp(path), data)
+    except OSError:
+        _FILE_CACHE.pop(path, None)
+
+# NumPy scalars can reach us from calculate_moods_batch() callers
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """Write `data` to a sibling temp file, then rename it over `path`."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def _write_ndjson(path: Path, entries: list):
+    _atomic_write_bytes(path, b"".join(orjson.dumps(e.to_dict(), option=_ORJSON_OPTS) + b"\n" for e in entries))
+
+# [whole second, its ISO-8601 UTC prefix] of the last timestamp formatted
+_iso_cache = [None, ""]
+
+def _fast_utcnow_iso() -> str:
+    """Current UTC time as ISO-8601 with microseconds; the date/time part is formatted once per second."""
+    t = time.time()
+    s = int(t)
+    if s != _iso_cache[0]:
+        _iso_cache[:] = [s, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(s))]
+    us = int((t - s) * 1e6)
+    return f"{_iso_cache[1]}.{us:06d}"
+
+# In-process mood history, oldest first; loaded from the log on first use,
+# after which appends go to both and the deque drops the oldest entry itself.
+_HISTORY: Optional[deque] = None
+
+def _read_mood_history() -> List[MoodEntry]:
+    """Read the history log, creating (or migrating) it if not present."""
+    try:
+        return _read_ndjson(MOOD_HISTORY_FILE)
+    except FileNotFoundError:
+        pass
+    history = []
+    try:
+        MOOD_HISTORY_FILE.parent.mkdir(exist_ok=True)
+        # First run on the .ndjson format: carry over the old JSON history if any
+        try:
+            legacy = _read_json(LEGACY_MOOD_HISTORY_FILE)[-MOOD_HISTORY_LIMIT:]
+        except FileNotFoundError:
             print("[Mood History]: Created default mood history file")
-        except Exception as e:
-            print(f"[Mood history init error]: {e}")
-        return []
+        else:
+            history = [MoodEntry.from_dict(e) for e in legacy]
+            print(f"[Mood History]: Migrated {len(history)} entries to {MOOD_HISTORY_FILE}")
+        _write_ndjson(MOOD_HISTORY_FILE, history)
+    except Exception as e:
+        print(f"[Mood history init error]: {e}")
+    return history
+
+def _history() -> deque:
+    global _HISTORY
+    if _HISTORY is None:
+        _HISTORY = deque(_read_mood_history(), maxlen=MOOD_HISTORY_LIMIT)
+    return _HISTORY
+
+def load_mood_entries() -> List[MoodEntry]:
+    """Load mood history (oldest first) as MoodEntry records and create file if not present."""
     try:
-        with open(MOOD_HISTORY_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return list(_history())
     except Exception as e:
         print(f"[Mood history load error]: {e}")
         return []
 
+def load_mood_history() -> List[Dict[str, Any]]:
+    """Load mood history (oldest first) as plain dicts and create file if not present."""
+    return [e.to_dict() for e in load_mood_entries()]
+
 def save_mood_history(history: list):
-    """Save mood history."""
+    """Save mood history (rewrites the whole log; update_mood() only appends)."""
+    global _HISTORY
     try:
         MOOD_HISTORY_FILE.parent.mkdir(exist_ok=True)
-        with open(MOOD_HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(history, f, indent=2)
+        entries = deque((e if isinstance(e, MoodEntry) else MoodEntry.from_dict(e) for e in history),
+                        maxlen=MOOD_HISTORY_LIMIT)
+        _write_ndjson(MOOD_HISTORY_FILE, entries)
+        _HISTORY = entries
     except Exception as e:
         print(f"[Mood history save error]: {e}")
 
-def calculate_mood_from_hormones(hormone_levels: Dict[str, float]) -> tuple:
-    """
-    FIXED: Calculate mood from hormone levels using deviation-based logic.
-    This is the CORRECTED mood calculation that was broken in hormone_api.py
-    """
-    print(f"[Mood Calculator]: Processing hormones {hormone_levels}")
-    
-    # Define mood patterns based on hormone deviations from baseline (0.5)
-    dopamine = hormone_levels.get("dopamine", 0.5)
-    serotonin = hormone_levels.get("serotonin", 0.5)
-    cortisol = hormone_levels.get("cortisol", 0.5) 
-    oxytocin = hormone_levels.get("oxytocin", 0.5)
-    
-    # Calculate deviations from baseline
-    dopa_dev = dopamine - 0.5
-    sero_dev = serotonin - 0.5
-    cort_dev = cortisol - 0.5
-    oxy_dev = oxytocin - 0.5
-    
-    print(f"[Mood Calculator]: Deviations - dopa:{dopa_dev:+.3f}, sero:{sero_dev:+.3f}, cort:{cort_dev:+.3f}, oxy:{oxy_dev:+.3f}")
-    
-    # Mood determination based on dominant patterns
-    mood_scores = {}
-    
-    # High cortisol patterns (stress/anxiety)  
-    if cort_dev > 0.1:
-        if sero_dev < -0.05:  # High cortisol + Low serotonin
-            mood_scores["anxious"] = abs(cort_dev) + abs(sero_dev) * 0.7
-        if dopa_dev < -0.05:  # High cortisol + Low dopamine  
-            mood_scores["restless"] = abs(cort_dev) + abs(dopa_dev) * 0.6
-        if cort_dev > 0.15:  # Very high cortisol
-            mood_scores["stressed"] = abs(cort_dev) * 1.2
-    
+def _rotate_mood_history():
+    """Trim the log on disk to its newest MOOD_HISTORY_LIMIT lines."""
+    with open(MOOD_HISTORY_FILE, "rb") as f:
+        lines = deque(f, maxlen=MOOD_HISTORY_LIMIT)
+    _atomic_write_bytes(MOOD_HISTORY_FILE, b"".join(lines))
+
+def _append_mood_entry(entry: MoodEntry):
+    """Append one history entry to the log, rotating it every MOOD_HISTORY_ROTATE_EVERY appends."""
+    global _APPENDS_SINCE_ROTATE
+    try:
+        history = _history()  # also creates/migrates the log
+        with open(MOOD_HISTORY_FILE, "ab") as f:
+            f.write(orjson.dumps(entry.to_dict(), option=_ORJSON_OPTS) + b"\n")
+        history.append(entry)
+        _APPENDS_SINCE_ROTATE += 1
+        if _APPENDS_SINCE_ROTATE >= MOOD_HISTORY_ROTATE_EVERY:
+            _rotate_mood_history()
+            _APPENDS_SINCE_ROTATE = 0
+    except Exception as e:
+        print(f"[Mood history save error]: {e}")
+
+# Mood rules, evaluated in order. A condition (hormone_index, sign, threshold)
+# holds when dev * sign > threshold, or |dev| > threshold for sign 0, where
+# dev is the hormone's deviation from the 0.5 baseline. A rule scores when all
+# of its `requires` hold and none of its `excludes` do; its score is
+# scale * sum(weight * |dev[i]| for i, weight in terms).
+DOPA, SERO, CORT, OXY = range(4)
+MOOD_RULES = (
+    # name, requires, excludes, terms, scale
+    # High cortisol patterns (stress/anxiety)
+    ("anxious", ((CORT, 1, 0.1), (SERO, -1, 0.05)), (), ((CORT, 1.0), (SERO, 0.7)), 1.0),
+    ("restless", ((CORT, 1, 0.1), (DOPA, -1, 0.05)), (), ((CORT, 1.0), (DOPA, 0.6)), 1.0),
+    ("stressed", ((CORT, 1, 0.15),), (), ((CORT, 1.0),), 1.2),
     # Low serotonin patterns (sadness/depression)
-    if sero_dev < -0.08:
-        if dopa_dev < -0.05:  # Low serotonin + Low dopamine
-            mood_scores["depressed"] = abs(sero_dev) + abs(dopa_dev) * 0.8
-        elif cort_dev > 0.05:  # Low serotonin + High cortisol  
-            mood_scores["melancholic"] = abs(sero_dev) + abs(cort_dev) * 0.6
-        else:
-            mood_scores["sad"] = abs(sero_dev) * 1.1
-    
+    ("depressed", ((SERO, -1, 0.08), (DOPA, -1, 0.05)), (), ((SERO, 1.0), (DOPA, 0.8)), 1.0),
+    ("melancholic", ((SERO, -1, 0.08), (CORT, 1, 0.05)), ((DOPA, -1, 0.05),), ((SERO, 1.0), (CORT, 0.6)), 1.0),
+    ("sad", ((SERO, -1, 0.08),), ((DOPA, -1, 0.05), (CORT, 1, 0.05)), ((SERO, 1.0),), 1.1),
     # High dopamine patterns (joy/excitement)
-    if dopa_dev > 0.08:
-        if oxy_dev > 0.05:  # High dopamine + High oxytocin
-            mood_scores["euphoric"] = dopa_dev + oxy_dev * 0.8
-        elif sero_dev > 0.05:  # High dopamine + High serotonin
-            mood_scores["cheerful"] = dopa_dev + sero_dev * 0.7
-        else:
-            mood_scores["energetic"] = dopa_dev * 1.2
-    
+    ("euphoric", ((DOPA, 1, 0.08), (OXY, 1, 0.05)), (), ((DOPA, 1.0), (OXY, 0.8)), 1.0),
+    ("cheerful", ((DOPA, 1, 0.08), (SERO, 1, 0.05)), ((OXY, 1, 0.05),), ((DOPA, 1.0), (SERO, 0.7)), 1.0),
+    ("energetic", ((DOPA, 1, 0.08),), ((OXY, 1, 0.05), (SERO, 1, 0.05)), ((DOPA, 1.0),), 1.2),
     # High oxytocin patterns (love/affection)
-    if oxy_dev > 0.1:
-        if dopa_dev > 0.05:  # High oxytocin + High dopamine
-            mood_scores["loving"] = oxy_dev + dopa_dev * 0.6
-        elif sero_dev > 0.03:  # High oxytocin + High serotonin
-            mood_scores["affectionate"] = oxy_dev + sero_dev * 0.8
-        else:
-            mood_scores["caring"] = oxy_dev * 1.1
-    
+    ("loving", ((OXY, 1, 0.1), (DOPA, 1, 0.05)), (), ((OXY, 1.0), (DOPA, 0.6)), 1.0),
+    ("affectionate", ((OXY, 1, 0.1), (SERO, 1, 0.03)), ((DOPA, 1, 0.05),), ((OXY, 1.0), (SERO, 0.8)), 1.0),
+    ("caring", ((OXY, 1, 0.1),), ((DOPA, 1, 0.05), (SERO, 1, 0.03)), ((OXY, 1.0),), 1.1),
     # Balanced positive states
-    if dopa_dev > 0.03 and sero_dev > 0.03 and cort_dev < 0.1:
-        mood_scores["content"] = (dopa_dev + sero_dev) * 0.8
-    
+    ("content", ((DOPA, 1, 0.03), (SERO, 1, 0.03), (CORT, -1, -0.1)), (), ((DOPA, 1.0), (SERO, 1.0)), 0.8),
     # Mixed/complex states
-    if abs(dopa_dev) > 0.05 and abs(sero_dev) > 0.05 and abs(cort_dev) > 0.05:
-        mood_scores["conflicted"] = (abs(dopa_dev) + abs(sero_dev) + abs(cort_dev)) * 0.4
-    
-    print(f"[Mood Calculator]: Mood scores calculated - {mood_scores}")
-    
-    # Find the highest scoring mood
-    if not mood_scores:
-        print("[Mood Calculator]: No strong patterns detected, defaulting to neutral")
-        return "neutral", 0.5
-    
-    # Get the mood with highest score
-    top_mood = max(mood_scores.items(), key=lambda x: x[1])
-    mood_name = top_mood[0]
-    raw_intensity = top_mood[1]
+    ("conflicted", ((DOPA, 0, 0.05), (SERO, 0, 0.05), (CORT, 0, 0.05)), (),
+     ((DOPA, 1.0), (SERO, 1.0), (CORT, 1.0)), 0.4),
+)
+
+# Mood names by index: 0 is the neutral fallback, i is MOOD_RULES[i - 1]
+MOOD_NAMES = ("neutral",) + tuple(rule[0] for rule in MOOD_RULES)
+NEUTRAL = 0
+_NO_SCORE = float("-inf")
+
+def _cond_holds(devs, abs_devs, cond):
+    """Evaluate one rule condition; works on scalars and on NumPy columns alike."""
+    i, sign, threshold = cond
+    return (abs_devs[i] if sign == 0 else devs[i] * sign) > threshold
+
+def _rule_score(abs_devs, terms, scale):
+    return scale * sum(weight * abs_devs[i] for i, weight in terms)
+
+def _rule_scores(devs) -> list:
+    """Score of every mood in MOOD_NAMES order; _NO_SCORE where its rule does not match."""
+    abs_devs = [abs(d) for d in devs]
+    # Index 0 (neutral) is never scored
+    scores = [_NO_SCORE] * len(MOOD_NAMES)
+    for i, (_, requires, excludes, terms, scale) in enumerate(MOOD_RULES, 1):
+        matched = True
+        for cond in requires:
+            matched = matched and _cond_holds(devs, abs_devs, cond)
+        for cond in excludes:
+            matched = matched and not _cond_holds(devs, abs_devs, cond)
+        if matched:
+            scores[i] = _rule_score(abs_devs, terms, scale)
+    return scores
+
+# Coarse pattern of a hormone state: one bit per gate condition below. Most
+# rules require one of these, so for a given pattern only the rules whose
+# gates are all set (plus the ungated ones) can possibly match.
+_PATTERN_GATES = ((DOPA, 1, 0.08), (SERO, -1, 0.08), (CORT, 1, 0.1), (OXY, 1, 0.1))
+
+def _rule_gates(requires) -> int:
+    """Bits of the gates implied by a rule's requirements (same hormone and sign, threshold at least the gate's)."""
+    bits = 0
+    for bit, (gi, gsign, gth) in enumerate(_PATTERN_GATES):
+        if any(i == gi and sign == gsign and th >= gth for i, sign, th in requires):
+            bits |= 1 << bit
+    return bits
+
+# Candidate rules per pattern, as (MOOD_NAMES index, requires, excludes, terms, scale), in table order
+_PATTERN_RULES = tuple(
+    tuple((i, *rule[1:]) for i, rule in enumerate(MOOD_RULES, 1)
+          if _rule_gates(rule[1]) & pattern == _rule_gates(rule[1]))
+    for pattern in range(1 << len(_PATTERN_GATES))
+)
+
+def _score_moods_py(dopa: float, sero: float, cort: float, oxy: float) -> tuple:
+    """(MOOD_NAMES index, raw score) of the best mood; (NEUTRAL, -1.0) if no rule matched."""
+    devs = (dopa, sero, cort, oxy)
+    abs_devs = (abs(dopa), abs(sero), abs(cort), abs(oxy))
+    pattern = 0
+    for bit, gate in enumerate(_PATTERN_GATES):
+        if _cond_holds(devs, abs_devs, gate):
+            pattern |= 1 << bit
+    # First one wins ties
+    best, raw = NEUTRAL, -1.0
+    for i, requires, excludes, terms, scale in _PATTERN_RULES[pattern]:
+        matched = True
+        for cond in requires:
+            matched = matched and _cond_holds(devs, abs_devs, cond)
+        for cond in excludes:
+            matched = matched and not _cond_holds(devs, abs_devs, cond)
+        if matched:
+            score = _rule_score(abs_devs, terms, scale)
+            if score > raw:
+                best, raw = i, score
+    return best, raw
+
+# MOOD_RULES as dense arrays for the compiled kernel. Per rule and hormone:
+# mode 0 = no condition, 1 = required, 2 = excluded, with its sign/threshold;
+# terms keep their table order so sums round exactly like _rule_score().
+def _dense_rules() -> tuple:
+    n_rules = len(MOOD_RULES)
+    max_terms = max(len(rule[3]) for rule in MOOD_RULES)
+    mode = np.zeros((n_rules, 4), dtype=np.int8)
+    sign = np.zeros((n_rules, 4))
+    threshold = np.zeros((n_rules, 4))
+    n_terms = np.zeros(n_rules, dtype=np.int64)
+    term_idx = np.zeros((n_rules, max_terms), dtype=np.int64)
+    term_w = np.zeros((n_rules, max_terms))
+    scale = np.zeros(n_rules)
+    for r, (name, requires, excludes, terms, rule_scale) in enumerate(MOOD_RULES):
+        for cond_mode, conds in ((1, requires), (2, excludes)):
+            for i, cond_sign, cond_th in conds:
+                if mode[r, i]:
+                    raise ValueError(f"Mood rule '{name}' has two conditions on {HORMONE_NAMES[i]}")
+                mode[r, i], sign[r, i], threshold[r, i] = cond_mode, cond_sign, cond_th
+        n_terms[r] = len(terms)
+        for t, (i, weight) in enumerate(terms):
+            term_idx[r, t], term_w[r, t] = i, weight
+        scale[r] = rule_scale
+    return n_rules, mode, sign, threshold, n_terms, term_idx, term_w, scale
+
+(_N_RULES, _RULE_MODE, _RULE_SIGN, _RULE_TH,
+ _RULE_NTERMS, _RULE_TERM_IDX, _RULE_TERM_W, _RULE_SCALE) = _dense_rules()
+
+def _score_moods_loop(dopa, sero, cort, oxy):
+    """Scalar-loop form of _score_moods_py() over the dense rule arrays, for numba to compile."""
+    devs = np.empty(4)
+    devs[0], devs[1], devs[2], devs[3] = dopa, sero, cort, oxy
+    best, raw = NEUTRAL, -1.0
+    for r in range(_N_RULES):
+        matched = True
+        for i in range(4):
+            mode = _RULE_MODE[r, i]
+            if mode == 0:
+                continue
+            sign = _RULE_SIGN[r, i]
+            value = abs(devs[i]) if sign == 0 else devs[i] * sign
+            if (value > _RULE_TH[r, i]) != (mode == 1):
+                matched = False
+                break
+        if not matched:
+            continue
+        total = 0.0
+        for t in range(_RULE_NTERMS[r]):
+            total += _RULE_TERM_W[r, t] * abs(devs[_RULE_TERM_IDX[r, t]])
+        score = _RULE_SCALE[r] * total
+        if score > raw:
+            best, raw = r + 1, score
+    return best, raw
+
+if numba is not None:
+    # No fastmath: the thresholds compare exactly and the sums must round like the table's
+    _score_moods = numba.njit(cache=True)(_score_moods_loop)
+    # Compile now (or load from the on-disk cache) rather than on the first mood update
+    _score_moods(0.0, 0.0, 0.0, 0.0)
+else:
+    _score_moods = _score_moods_py
+
+# Hormone levels are quantized to this many steps per unit before scoring;
+# states that drift by less than a step share one cached result.
+MOOD_QUANT_STEPS = 100
+
+@lru_cache(maxsize=4096)
+def _calc_mood_quantized(d_q: int, s_q: int, c_q: int, o_q: int) -> tuple:
+    """Score the moods for one quantized hormone state (see MOOD_QUANT_STEPS)."""
+    # Deviations from baseline (0.5), in HORMONE_NAMES order
+    devs = [q / MOOD_QUANT_STEPS - 0.5 for q in (d_q, s_q, c_q, o_q)]
+    
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("[Mood Calculator]: Deviations - dopa:%+.3f, sero:%+.3f, cort:%+.3f, oxy:%+.3f",
+                  devs[DOPA], devs[SERO], devs[CORT], devs[OXY])
+        log.debug("[Mood Calculator]: Mood scores calculated - %s",
+                  {MOOD_NAMES[i]: v for i, v in enumerate(_rule_scores(devs)) if v != _NO_SCORE})
+    
+    best, raw_intensity = _score_moods(*devs)
+    if best == NEUTRAL:
+        log.debug("[Mood Calculator]: No strong patterns detected, defaulting to neutral")
+        return MOOD_NAMES[NEUTRAL], 0.5
     
     # Scale intensity to 0.0-1.0 range (cap at 1.0)
-    intensity = min(1.0, max(0.1, raw_intensity))
+    intensity = min(1.0, max(0.1, float(raw_intensity)))
+    return MOOD_NAMES[int(best)], intensity
+
+def calculate_mood_from_hormones(hormone_levels: Union[Hormones, Mapping[str, float]]) -> tuple:
+    """
+    FIXED: Calculate mood from hormone levels using deviation-based logic.
+    This is the CORRECTED mood calculation that was broken in hormone_api.py
+    Takes a Hormones tuple (or a name -> level mapping, missing names at 0.5).
+    Levels are rounded to 1/MOOD_QUANT_STEPS and the result memoized.
+    """
+    log.debug("[Mood Calculator]: Processing hormones %s", hormone_levels)
+    
+    if isinstance(hormone_levels, Mapping):
+        hormone_levels = [hormone_levels.get(h, 0.5) for h in HORMONE_NAMES]
+    dopa, sero, cort, oxy = hormone_levels
+    mood_name, intensity = _calc_mood_quantized(
+        int(round(dopa * MOOD_QUANT_STEPS)),
+        int(round(sero * MOOD_QUANT_STEPS)),
+        int(round(cort * MOOD_QUANT_STEPS)),
+        int(round(oxy * MOOD_QUANT_STEPS)),
+    )
     
-    print(f"[Mood Calculator]: Selected mood '{mood_name}' with intensity {intensity:.3f}")
+    log.debug("[Mood Calculator]: Selected mood '%s' with intensity %.3f", mood_name, intensity)
     
     return mood_name, intensity
 
-def update_mood(new_mood: str, intensity: float, reason: str = "", hormone_context: Dict = None):
-    """Update current mood and log to history with enhanced context."""
+def calculate_moods_batch(arr: np.ndarray) -> tuple:
+    """
+    Vectorized calculate_mood_from_hormones() over many hormone states.
+    `arr` is (N, 4) hormone levels in HORMONE_NAMES order.
+    Returns (moods, intensities): an object array of mood names and a float array.
+    """
+    arr = np.asarray(arr, dtype=np.float64).reshape(-1, 4)
+    devs = (arr - 0.5).T
+    abs_devs = np.abs(devs)
+
+    n = len(arr)
+    scores = np.full((n, len(MOOD_RULES)), -np.inf)
+    for col, (_, requires, excludes, terms, scale) in enumerate(MOOD_RULES):
+        mask = np.ones(n, dtype=bool)
+        for cond in requires:
+            mask &= _cond_holds(devs, abs_devs, cond)
+        for cond in excludes:
+            mask &= ~_cond_holds(devs, abs_devs, cond)
+        scores[:, col] = np.where(mask, _rule_score(abs_devs, terms, scale), -np.inf)
+
+    idx = scores.argmax(axis=1)
+    best = scores[np.arange(n), idx]
+    matched = np.isfinite(best)
+    moods = np.where(matched, np.array(MOOD_NAMES[1:], dtype=object)[idx], MOOD_NAMES[NEUTRAL])
+    intensities = np.where(matched, np.clip(best, 0.1, 1.0), 0.5)
+    return moods, intensities
+
+# Last mood written by update_mood(), with the stamp mood_adjustments.json
+# had right after that write. Repeats of it (same mood, intensity within
+# MOOD_WRITE_EPSILON) are skipped while the file still carries that stamp, so
+# any other writer (another process, app.py's init) re-arms the write.
+# Every MOOD_HEARTBEAT_EVERY-th repeat is written anyway so the history still
+# shows the mood holding.
+MOOD_WRITE_EPSILON = 0.01
+MOOD_HEARTBEAT_EVERY = 20
+_LAST_MOOD_STATE = {"mood": None, "intensity": None, "skipped": 0, "stamp": None}
+
+def _adjustments_stamp() -> Optional[tuple]:
+    try:
+        return _file_stamp(MOOD_ADJUSTMENTS_FILE)
+    except OSError:
+        return None
+
+def update_mood(new_mood: str, intensity: float, reason: str = "", hormone_context: Dict = None,
+                hormone_snapshot: Optional[Dict[str, float]] = None, force: bool = False):
+    """
+    Update current mood and log to history with enhanced context.
+    `hormone_snapshot` is the hormone state the mood was computed from, if
+    the caller already has it; otherwise it is reloaded when needed.
+    `force` writes even an unchanged mood (explicit resets/recalculations).
+    """
+    last = _LAST_MOOD_STATE
+    if (not force
+            and new_mood == last["mood"]
+            and abs(intensity - last["intensity"]) < MOOD_WRITE_EPSILON
+            and last["skipped"] + 1 < MOOD_HEARTBEAT_EVERY
+            and _adjustments_stamp() == last["stamp"]):
+        last["skipped"] += 1
+        log.debug("[Mood Update]: %s unchanged (intensity: %.2f) - %s, skipped", new_mood, intensity, reason)
+        return
+
     # Get mood context if not provided
     if hormone_context is None:
         hormone_context = get_mood_context(new_mood, intensity)
     
+    now = _fast_utcnow_iso()
+
     # Update mood_adjustments.json with enhanced data
     mood_data = {
         "current_mood": new_mood,
         "intensity": intensity,  
         "context": hormone_context,
-        "last_updated": datetime.utcnow().isoformat()
+        "last_updated": now
     }
 
     try:
-        with open("persona/mood_adjustments.json", "w", encoding="utf-8") as f:
-            json.dump(mood_data, f, indent=2)
+        _atomic_write_bytes(
+            MOOD_ADJUSTMENTS_FILE,
+            orjson.dumps(mood_data, option=_ORJSON_OPTS | orjson.OPT_INDENT_2),
+        )
+        _remember_json(MOOD_ADJUSTMENTS_FILE, mood_data)
     except Exception as e:
         print(f"[Mood update error]: {e}")
         return
+    last.update(mood=new_mood, intensity=intensity, skipped=0, stamp=_adjustments_stamp())
 
     # Log to history with enhanced information
-    history = load_mood_history()
-    history_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "mood": new_mood,
-        "intensity": intensity,
-        "reason": reason,
-        "is_hybrid": hormone_context.get("is_hybrid", False),
-        "is_emergent": hormone_context.get("is_emergent", False),
-        "stability": hormone_context.get("stability", "medium")
-    }
+    history_entry = MoodEntry(
+        timestamp=now,
+        mood=new_mood,
+        intensity=intensity,
+        reason=reason,
+        is_hybrid=hormone_context.get("is_hybrid", False),
+        is_emergent=hormone_context.get("is_emergent", False),
+        stability=hormone_context.get("stability", "medium"),
+    )
     
     # Add hormone levels snapshot for debugging contextual changes
     if reason and ("contextual" in reason or "hormone_event" in reason):
-        history_entry["hormone_snapshot"] = load_hormone_levels()
-    
-    history.append(history_entry)
-
-    # Keep only last 100 mood changes
-    if len(history) > 100:
-        history = history[-100:]
-
-    save_mood_history(history)
-    
-    # Print mood change for debugging
-    mood_type = ""
-    if hormone_context.get("is_hybrid"):
-        mood_type = " [HYBRID]"
-    elif hormone_context.get("is_emergent"):
-        mood_type = " [EMERGENT]"
-    
-    print(f"[Mood Update]: {new_mood}{mood_type} (intensity: {intensity:.2f}) - {reason}")
+        if hormone_snapshot is None:
+            hormone_snapshot = load_hormone_levels()
+        history_entry.hormone_snapshot = dict(hormone_snapshot)
+    
+    _append_mood_entry(history_entry)
+    
+    # Log mood change for debugging
+    if log.isEnabledFor(logging.DEBUG):
+        mood_type = ""
+        if hormone_context.get("is_hybrid"):
+            mood_type = " [HYBRID]"
+        elif hormone_context.get("is_emergent"):
+            mood_type = " [EMERGENT]"
+        log.debug("[Mood Update]: %s%s (intensity: %.2f) - %s", new_mood, mood_type, intensity, reason)
 
 def get_current_mood() -> Dict[str, Any]:
     """Get current mood settings with enhanced context."""
     try:
-        with open("persona/mood_adjustments.json", "r", encoding="utf-8") as f:
-            return json.load(f)
+        return dict(_cached_load(MOOD_ADJUSTMENTS_FILE))
     except Exception as e:
         print(f"[Current mood load error]: {e}")
         return {
             "current_mood": "neutral", 
             "intensity": 0.5,
             "context": {"is_hybrid": False, "is_emergent": False, "stability": "medium"},
-            "last_updated": datetime.utcnow().isoformat()
+            "last_updated": _fast_utcnow_iso()
         }
 
-def update_mood_from_hormones(reason="hormonal_shift"):
+def update_mood_from_hormones(reason="hormonal_shift", force=False):
     """
     FIXED: Calculate mood from current hormone levels and update mood accordingly.
     Now uses our own mood calculation instead of the broken hormone_api function.
     """
-    print(f"[Mood From Hormones]: Starting mood update for reason '{reason}'")
+    log.debug("[Mood From Hormones]: Starting mood update for reason '%s'", reason)
     
     # Load current hormone levels
-    hormone_levels = load_hormone_levels()
-    print(f"[Mood From Hormones]: Current hormones - {hormone_levels}")
+    hormones = load_hormone_tuple()
+    log.debug("[Mood From Hormones]: Current hormones - %s", hormones)
     
     # Use OUR fixed mood calculation (not the broken one from hormone_api)
-    mood, intensity = calculate_mood_from_hormones(hormone_levels)
-    print(f"[Mood From Hormones]: Calculated mood '{mood}' with intensity {intensity:.3f}")
+    mood, intensity = calculate_mood_from_hormones(hormones)
+    log.debug("[Mood From Hormones]: Calculated mood '%s' with intensity %.3f", mood, intensity)
     
     # Get enhanced context
     context = get_mood_context(mood, intensity)
     
     # Update mood with context
-    update_mood(mood, intensity, reason, context)
+    update_mood(mood, intensity, reason, context, hormone_snapshot=hormones._asdict(), force=force)
     
     return mood, intensity, context
 
@@ -228,19 +583,19 @@ def handle_event_and_update_mood(event: str):
     """
     Adjust hormones based on an event, then update mood from new hormone state.
     """
-    print(f"[Event Trigger]: Processing event '{event}'")
+    log.debug("[Event Trigger]: Processing event '%s'", event)
     
     # Import locally to avoid circular import
     from .hormone_adjuster import adjust_hormones
     
     # First adjust hormones based on the event
     new_hormones = adjust_hormones(event)
-    print(f"[Hormone Update]: New levels - {new_hormones}")
+    log.debug("[Hormone Update]: New levels - %s", new_hormones)
     
     # Then update mood based on new hormone levels
     mood, intensity, context = update_mood_from_hormones(reason=f"hormone_event:{event}")
     
-    print(f"[Event Processed]: {event} -> Mood: {mood} ({intensity:.2f})")
+    log.debug("[Event Processed]: %s -> Mood: %s (%.2f)", event, mood, intensity)
     
     return mood, intensity, context, new_hormones
 
@@ -248,19 +603,19 @@ def apply_sentiment_to_mood(conversation_text: str):
     """
     Enhanced sentiment analysis using contextual hormone adjustments.
     """
-    print(f"[Enhanced Sentiment]: Processing input '{conversation_text}'")
+    log.debug("[Enhanced Sentiment]: Processing input '%s'", conversation_text)
     
     # Import locally to avoid circular import
     from .hormone_adjuster import apply_contextual_hormone_adjustments
     
     # Use the enhanced contextual hormone adjustment system
     new_hormones = apply_contextual_hormone_adjustments(conversation_text)
-    print(f"[Enhanced Sentiment]: New hormone levels - {new_hormones}")
+    log.debug("[Enhanced Sentiment]: New hormone levels - %s", new_hormones)
     
     # Update mood based on the new hormone levels using OUR fixed calculation
     mood, intensity, context = update_mood_from_hormones(reason="contextual_analysis")
     
-    print(f"[Enhanced Sentiment Complete]: {mood} ({intensity:.2f}) from '{conversation_text}'")
+    log.debug("[Enhanced Sentiment Complete]: %s (%.2f) from '%s'", mood, intensity, conversation_text)
     
     return mood, intensity, context
 
@@ -270,10 +625,18 @@ def get_mood_summary() -> Dict[str, Any]:
     """
     current_mood_data = get_current_mood()
     hormone_levels = load_hormone_levels()
-    history = load_mood_history()
-    recent_moods = [entry["mood"] for entry in history[-10:]] if history else []
-    hybrid_count = sum(1 for entry in history[-20:] if entry.get("is_hybrid", False)) if history else 0 
-    emergent_count = sum(1 for entry in history[-20:] if entry.get("is_emergent", False)) if history else 0
+    history = load_mood_entries()
+    # One pass over the last 20 entries; moods come from the last 10 of them
+    window = history[-20:]
+    first_recent = len(window) - 10
+    recent_moods = []
+    hybrid_count = emergent_count = 0
+    for i, entry in enumerate(window):
+        if i >= first_recent:
+            recent_moods.append(entry.mood)
+        hybrid_count += bool(entry.is_hybrid)
+        emergent_count += bool(entry.is_emergent)
+    unique_recent = len(set(recent_moods))
     
     summary = {
         "current_state": current_mood_data,
@@ -286,7 +649,7 @@ def get_mood_summary() -> Dict[str, Any]:
         },
         "complexity_indicators": {
             "has_undefined_states": hybrid_count > 0 or emergent_count > 0,
-            "mood_volatility": "high" if len(set(recent_moods)) > 6 else "medium" if len(set(recent_moods)) > 3 else "low"
+            "mood_volatility": "high" if unique_recent > 6 else "medium" if unique_recent > 3 else "low"
         }
     }
     return summary
@@ -295,23 +658,24 @@ def force_mood_recalculation():
     """
     Force a complete recalculation of mood from current hormone levels.
     """
-    print("[Debug]: Forcing mood recalculation from hormones...")
-    return update_mood_from_hormones(reason="manual_recalculation")
+    log.debug("[Debug]: Forcing mood recalculation from hormones...")
+    return update_mood_from_hormones(reason="manual_recalculation", force=True)
 
 def simulate_hormone_fluctuation():
     """
     Simulate natural hormone fluctuation over time.
     """
-    import random
-    hormones = load_hormone_levels()
-    print(f"[Hormone Fluctuation]: Before - {hormones}")
-    for hormone in hormones:
-        drift = random.uniform(-0.02, 0.02)
-        baseline_pull = (0.5 - hormones[hormone]) * 0.01
-        hormones[hormone] += drift + baseline_pull
-        hormones[hormone] = max(0.0, min(1.0, hormones[hormone]))
-    print(f"[Hormone Fluctuation]: After - {hormones}")
-    save_hormone_levels(hormones)
+    vals = load_hormone_array()
+    debug = log.isEnabledFor(logging.DEBUG)
+    if debug:
+        log.debug("[Hormone Fluctuation]: Before - %s", dict(zip(HORMONE_NAMES, vals.tolist())))
+    drift = np.random.uniform(-0.02, 0.02, size=vals.size)
+    baseline_pull = (0.5 - vals) * 0.01
+    vals += drift + baseline_pull
+    np.clip(vals, 0.0, 1.0, out=vals)
+    if debug:
+        log.debug("[Hormone Fluctuation]: After - %s", dict(zip(HORMONE_NAMES, vals.tolist())))
+    save_hormone_array(vals)
     return update_mood_from_hormones(reason="natural_fluctuation")
 
 # Debug function for testing mood calculation
@@ -328,14 +692,17 @@ def test_mood_calculation():
     print("\n🧪 TESTING MOOD CALCULATION")
     print("=" * 50)
     
-    for case in test_cases:
+    levels = np.array([[case["hormones"].get(h, 0.5) for h in HORMONE_NAMES] for case in test_cases])
+    moods, intensities = calculate_moods_batch(levels)
+
+    for case, mood, intensity in zip(test_cases, moods, intensities):
         print(f"\n📝 Test: {case['name']}")
         print(f"   Hormones: {case['hormones']}")
-        mood, intensity = calculate_mood_from_hormones(case['hormones'])
         print(f"   Result: {mood} (intensity: {intensity:.2f})")
     
     print("\n" + "=" * 50)
     print("✅ Mood calculation test complete!")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
     test_mood_calculation()
\ No newline at end of file
@@ -0,0 +1,39 @@
+# tests/test_hormone_update.py
+"""
+The hormone update step in persona.hormone_adjuster has a NumPy form and
+a scalar-loop form (compiled by numba when installed); both must give
+bit-identical levels and applied deltas.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from persona import hormone_adjuster as ha
+
+
+def _cases(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        current = rng.uniform(0.0, 1.0, 4)
+        # Include levels at and near the clip bounds and the baseline
+        current[rng.integers(4)] = rng.choice([0.0, 1.0, 0.5, 0.495, 0.505])
+        delta = rng.uniform(-0.2, 0.2, 4)
+        touched = rng.random(4) < 0.6
+        yield current, delta, touched, bool(rng.random() < 0.2)
+
+
+@pytest.mark.parametrize("kernel", ["loop", "selected"])
+def test_update_kernels_match_numpy(kernel):
+    fn = ha._update_hormones_loop if kernel == "loop" else ha._update_hormones
+    for current, delta, touched, neutral in _cases():
+        expected = ha._update_hormones_np(current, delta, touched, ha._RATE_LIMIT, ha._DECAY_STEP, neutral)
+        got = fn(current, delta, touched, ha._RATE_LIMIT, ha._DECAY_STEP, neutral)
+        np.testing.assert_array_equal(got[0], expected[0])
+        np.testing.assert_array_equal(got[1], expected[1])
+
+
+def test_compiled_kernel_is_wired_in():
+    pytest.importorskip("numba")
+    assert ha._update_hormones is not ha._update_hormones_np
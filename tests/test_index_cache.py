@@ -0,0 +1,112 @@
+# tests/test_index_cache.py
+"""
+The three search tiers of core.index_cache (int8 matmul, 8-bit scalar
+quantized FAISS, HNSW) must return the same neighbours for the same corpus.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+from core import index_cache as ic
+
+DIM = 64
+N = 2500
+K = 10
+
+
+def _unit(x):
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = np.random.default_rng(0)
+    vecs = _unit(rng.standard_normal((N, DIM)))
+    # Each query is a noisy copy of a known passage, so its true top hit is fixed
+    targets = rng.choice(N, size=50, replace=False)
+    queries = _unit(vecs[targets] + 0.2 * rng.standard_normal((len(targets), DIM)) / np.sqrt(DIM))
+    return vecs, [str(i) for i in range(N)], queries, targets
+
+
+def _search_all(monkeypatch, vecs, texts, queries, flat_max, hnsw_min):
+    monkeypatch.setattr(ic, "FLAT_SEARCH_MAX", flat_max)
+    monkeypatch.setattr(ic, "HNSW_MIN", hnsw_min)
+    entry = ic.CachedIndex.from_vectors(vecs, texts)
+    return entry, [entry.search(q[None, :], K)[1][0] for q in queries]
+
+
+@pytest.fixture(scope="module")
+def exact(corpus):
+    vecs, _, queries, _ = corpus
+    return [np.argsort(-(vecs @ q))[:K] for q in queries]
+
+
+@pytest.mark.parametrize("tier, flat_max, hnsw_min", [
+    ("matmul", N + 1, N + 1),
+    ("sq8", 0, N + 1),
+    ("hnsw", 0, 0),
+])
+def test_tier_matches_exact_search(monkeypatch, corpus, exact, tier, flat_max, hnsw_min):
+    vecs, texts, queries, targets = corpus
+    entry, found = _search_all(monkeypatch, vecs, texts, queries, flat_max, hnsw_min)
+    if tier == "matmul":
+        assert entry._index is None
+    else:
+        expected = ic.faiss.IndexHNSWFlat if tier == "hnsw" else ic.faiss.IndexScalarQuantizer
+        assert isinstance(entry.index, expected)
+    assert [int(ids[0]) for ids in found] == targets.tolist()
+    recall = np.mean([len(set(a) & set(b)) / K for a, b in zip(found, exact)])
+    assert recall >= 0.9
+
+
+def test_tiers_agree_with_each_other(monkeypatch, corpus):
+    vecs, texts, queries, _ = corpus
+    results = [
+        _search_all(monkeypatch, vecs, texts, queries, flat_max, hnsw_min)[1]
+        for flat_max, hnsw_min in ((N + 1, N + 1), (0, N + 1), (0, 0))
+    ]
+    for other in results[1:]:
+        overlap = np.mean([len(set(a) & set(b)) / K for a, b in zip(results[0], other)])
+        assert overlap >= 0.9
+
+
+def test_add_past_hnsw_min_rebuilds_as_hnsw(monkeypatch, corpus):
+    vecs, texts, queries, targets = corpus
+    monkeypatch.setattr(ic, "FLAT_SEARCH_MAX", 0)
+    monkeypatch.setattr(ic, "HNSW_MIN", N)
+    entry = ic.CachedIndex.from_vectors(vecs[: N // 2], texts[: N // 2])
+    assert isinstance(entry.index, ic.faiss.IndexScalarQuantizer)
+    entry.add(vecs[N // 2:], texts[N // 2:])
+    assert isinstance(entry.index, ic.faiss.IndexHNSWFlat)
+    assert entry.index.ntotal == N
+    top = [int(entry.search(q[None, :], 1)[1][0][0]) for q in queries]
+    assert top == targets.tolist()
+
+
+def test_search_many_matches_per_corpus_search(corpus):
+    vecs, texts, queries, _ = corpus
+    entries = [ic.CachedIndex.from_vectors(vecs[:300], texts[:300]),
+               ic.CachedIndex.from_vectors(vecs[300:400], texts[300:400])]
+    q = queries[:1]
+    for (d, i), entry in zip(ic.search_many(entries, q, [5, 3]), entries):
+        d_ref, i_ref = entry.search(q, 5 if entry is entries[0] else 3)
+        np.testing.assert_array_equal(i, i_ref)
+        np.testing.assert_allclose(d, d_ref, rtol=1e-6)
+
+
+def test_extended_hnsw_scores_like_a_fresh_build(monkeypatch, corpus):
+    # HNSW stores the vectors it is given as-is, so both paths must add the
+    # same dequantized rows (SQ8 is left out: its training range differs)
+    vecs, texts, queries, _ = corpus
+    monkeypatch.setattr(ic, "FLAT_SEARCH_MAX", 0)
+    monkeypatch.setattr(ic, "HNSW_MIN", 0)
+    fresh = ic.CachedIndex.from_vectors(vecs, texts)
+    grown = ic.CachedIndex.from_vectors(vecs[:1000], texts[:1000])
+    grown.index  # build before extending, as a live corpus would
+    grown.add(vecs[1000:], texts[1000:])
+    for q in queries[:10]:
+        d_fresh, i_fresh = fresh.search(q[None, :], K)
+        d_grown, i_grown = grown.search(q[None, :], K)
+        np.testing.assert_array_equal(i_grown, i_fresh)
+        np.testing.assert_allclose(d_grown, d_fresh, rtol=1e-5)
@@ -0,0 +1,108 @@
+# tests/test_mood_scoring.py
+"""
+The mood scorers in persona.mood_tracker must agree with each other:
+the Python table scorer, the dense-array loop (compiled by numba when
+installed) and the vectorized batch kernel. All of them must also match
+the original if/elif cascade the MOOD_RULES table replaced.
+"""
+import numpy as np
+import pytest
+
+from persona import mood_tracker as mt
+
+
+def _states(n=5000, seed=0):
+    """Hormone levels in HORMONE_NAMES order: half on the 0.01 grid, half arbitrary."""
+    rng = np.random.default_rng(seed)
+    levels = rng.uniform(0.2, 0.8, size=(n, 4))
+    levels[: n // 2] = np.round(levels[: n // 2], 2)
+    return levels
+
+
+def _baseline_mood(levels):
+    """The pre-MOOD_RULES calculate_mood_from_hormones(), minus its logging."""
+    dopa_dev, sero_dev, cort_dev, oxy_dev = (float(v) - 0.5 for v in levels)
+    mood_scores = {}
+    if cort_dev > 0.1:
+        if sero_dev < -0.05:
+            mood_scores["anxious"] = abs(cort_dev) + abs(sero_dev) * 0.7
+        if dopa_dev < -0.05:
+            mood_scores["restless"] = abs(cort_dev) + abs(dopa_dev) * 0.6
+        if cort_dev > 0.15:
+            mood_scores["stressed"] = abs(cort_dev) * 1.2
+    if sero_dev < -0.08:
+        if dopa_dev < -0.05:
+            mood_scores["depressed"] = abs(sero_dev) + abs(dopa_dev) * 0.8
+        elif cort_dev > 0.05:
+            mood_scores["melancholic"] = abs(sero_dev) + abs(cort_dev) * 0.6
+        else:
+            mood_scores["sad"] = abs(sero_dev) * 1.1
+    if dopa_dev > 0.08:
+        if oxy_dev > 0.05:
+            mood_scores["euphoric"] = dopa_dev + oxy_dev * 0.8
+        elif sero_dev > 0.05:
+            mood_scores["cheerful"] = dopa_dev + sero_dev * 0.7
+        else:
+            mood_scores["energetic"] = dopa_dev * 1.2
+    if oxy_dev > 0.1:
+        if dopa_dev > 0.05:
+            mood_scores["loving"] = oxy_dev + dopa_dev * 0.6
+        elif sero_dev > 0.03:
+            mood_scores["affectionate"] = oxy_dev + sero_dev * 0.8
+        else:
+            mood_scores["caring"] = oxy_dev * 1.1
+    if dopa_dev > 0.03 and sero_dev > 0.03 and cort_dev < 0.1:
+        mood_scores["content"] = (dopa_dev + sero_dev) * 0.8
+    if abs(dopa_dev) > 0.05 and abs(sero_dev) > 0.05 and abs(cort_dev) > 0.05:
+        mood_scores["conflicted"] = (abs(dopa_dev) + abs(sero_dev) + abs(cort_dev)) * 0.4
+    if not mood_scores:
+        return "neutral", 0.5
+    mood_name, raw_intensity = max(mood_scores.items(), key=lambda x: x[1])
+    return mood_name, min(1.0, max(0.1, raw_intensity))
+
+
+def test_table_scorer_matches_baseline_cascade():
+    for row in _states(20000, seed=1):
+        best, raw = mt._score_moods_py(*(row - 0.5).tolist())
+        if best == mt.NEUTRAL:
+            got = ("neutral", 0.5)
+        else:
+            got = (mt.MOOD_NAMES[best], min(1.0, max(0.1, raw)))
+        assert got == _baseline_mood(row)
+
+
+def test_public_calculator_matches_baseline_on_grid():
+    # calculate_mood_from_hormones() quantizes to the 0.01 grid, where it must be exact
+    levels = np.round(_states(20000, seed=2), 2)
+    for row in levels:
+        hormones = dict(zip(mt.HORMONE_NAMES, row.tolist()))
+        assert mt.calculate_mood_from_hormones(hormones) == _baseline_mood(row)
+        assert mt.calculate_mood_from_hormones(mt.Hormones(*row.tolist())) == _baseline_mood(row)
+
+
+def test_loop_kernel_matches_python_scorer():
+    for row in _states():
+        devs = (row - 0.5).tolist()
+        assert mt._score_moods_loop(*devs) == mt._score_moods_py(*devs)
+
+
+def test_compiled_kernel_matches_python_scorer():
+    pytest.importorskip("numba")
+    # With numba installed, the module wires in the njit build of the loop
+    assert mt._score_moods is not mt._score_moods_py
+    for row in _states():
+        devs = (row - 0.5).tolist()
+        best, raw = mt._score_moods(*devs)
+        assert (int(best), float(raw)) == mt._score_moods_py(*devs)
+
+
+def test_batch_kernel_matches_scalar_scorer():
+    levels = _states()
+    moods, intensities = mt.calculate_moods_batch(levels)
+    for row, mood, intensity in zip(levels, moods, intensities):
+        best, raw = mt._score_moods_py(*(row - 0.5).tolist())
+        if best == mt.NEUTRAL:
+            assert (mood, intensity) == ("neutral", 0.5)
+        else:
+            assert mood == mt.MOOD_NAMES[best]
+            assert intensity == min(1.0, max(0.1, raw))
@@ -0,0 +1,70 @@
+# utils/cached_loaders.py
+"""
+Streamlit-cached accessors for the app.
+Streamlit reruns app.py on every interaction, so the sidebar reads go
+through st.cache_data and the once-per-process model warmups through
+st.cache_resource.
+Call clear_state_caches() after anything that writes mood/hormones/facts/turns.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from core.fact_extractor import load_facts
+from core.vectorstore import get_bge_model
+from memory.turn_memory import load_memory
+from persona.hormone_api import load_hormone_levels
+from persona.mood_tracker import get_current_mood
+
+
+@st.cache_resource
+def start_bge_warmup() -> threading.Thread:
+    """Load BGE-M3 (core.vectorstore's singleton) in the background, once per process."""
+    thread = threading.Thread(target=get_bge_model, name="bge-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def start_sentiment_warmup() -> threading.Thread:
+    """Load the emotion/toxicity models in the background, once per process."""
+    from persona.emotion_nsfw_checker import warmup_pipelines
+
+    thread = threading.Thread(target=warmup_pipelines, name="sentiment-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource
+def get_side_effect_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for the independent per-turn side effects."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="turn-side-effect")
+
+
+@st.cache_data(ttl=10)
+def cached_load_facts() -> list[str]:
+    return load_facts()
+
+
+@st.cache_data(ttl=5)
+def cached_memory_turn_count() -> int:
+    return len(load_memory())
+
+
+@st.cache_data(ttl=10)
+def cached_get_current_mood() -> dict:
+    return get_current_mood()
+
+
+@st.cache_data(ttl=10)
+def cached_load_hormone_levels() -> dict:
+    return load_hormone_levels()
+
+
+def clear_state_caches():
+    """Drop cached sidebar data so the next read sees fresh files."""
+    cached_load_facts.clear()
+    cached_memory_turn_count.clear()
+    cached_get_current_mood.clear()
+    cached_load_hormone_levels.clear()
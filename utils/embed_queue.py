@@ -0,0 +1,80 @@
+# utils/embed_queue.py
+"""
+Coalescing queue for BGE-M3 encodes on the chat path.
+Streamlit runs each session in its own thread; texts (per-turn queries and
+the few new passages each turn adds) that arrive within BATCH_WINDOW of each
+other are encoded in one model.encode call by a single worker thread instead
+of contending for the model one by one.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+BATCH_WINDOW = 0.005  # seconds to wait for more texts after the first one
+MAX_BATCH = 16
+
+_PENDING: "queue.Queue[tuple[str, Future]]" = queue.Queue()
+_WORKER = None
+_WORKER_LOCK = threading.Lock()
+
+
+def _drain():
+    """Block for one text, then collect more until the window closes or the batch is full."""
+    batch = [_PENDING.get()]
+    deadline = time.monotonic() + BATCH_WINDOW
+    while len(batch) < MAX_BATCH:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_PENDING.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def _run():
+    from core.vectorstore import get_bge_model
+
+    while True:
+        batch = _drain()
+        try:
+            vecs = get_bge_model().encode(
+                [text for text, _ in batch],
+                normalize_embeddings=True,
+                batch_size=MAX_BATCH,
+                convert_to_numpy=True,
+            )
+        except Exception as e:
+            print(f"[Embed Queue]: Batch of {len(batch)} failed: {e}")
+            for _, fut in batch:
+                fut.set_exception(e)
+            continue
+        for (_, fut), vec in zip(batch, vecs):
+            fut.set_result(vec)
+
+
+def _ensure_worker():
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is None or not _WORKER.is_alive():
+            _WORKER = threading.Thread(target=_run, name="embed-queue", daemon=True)
+            _WORKER.start()
+
+
+def embed(text: str) -> Future:
+    """Queue an already-prefixed text; the Future resolves to its normalized float32 vector."""
+    return embed_many([text])[0]
+
+
+def embed_many(texts: list) -> list:
+    """Queue several already-prefixed texts back to back; one Future per text, in order."""
+    _ensure_worker()
+    futures = [Future() for _ in texts]
+    for text, fut in zip(texts, futures):
+        _PENDING.put((text, fut))
+    return futures
+
+
+__all__ = ["embed", "embed_many"]
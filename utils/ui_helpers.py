@@ -1,8 +1,23 @@
 # utils/ui_helpers.py (Updated: Renamed to render_message, adjusted to handle single messages without skipping system)
 import streamlit as st
 
-def render_message(msg):
+# Messages rendered as individual chat bubbles; older ones collapse into one expander
+RECENT_MESSAGES = 20
+
+def _format_message(msg):
     role = msg["role"]
     label = "User:" if role == "user" else "Assistant:" if role == "assistant" else "System:"
-    with st.chat_message(role):
-        st.markdown(f"**{label}** {msg['content']}")
+    return f"**{label}** {msg['content']}"
+
+def render_message(msg):
+    with st.chat_message(msg["role"]):
+        st.markdown(_format_message(msg))
+
+def render_history(turns, recent=RECENT_MESSAGES):
+    """Render the last `recent` messages as bubbles and everything before them as a single markdown block."""
+    older, latest = turns[:-recent], turns[-recent:]
+    if older:
+        with st.expander(f"Earlier messages ({len(older)})"):
+            st.markdown("\n\n".join(_format_message(m) for m in older))
+    for m in latest:
+        render_message(m)